@@ -0,0 +1,34 @@
+import importlib
+
+# Public classes by module, imported on first access so `import mermaid_py` stays cheap and optional backends, eg.
+# httpx for AsyncClient, are only imported when used.
+_EXPORTS = {
+    "Client": "client",
+    "AsyncClient": "async_client",
+    "ResponseCache": "cache",
+    "MemoryCache": "cache",
+    "CachePolicy": "cache",
+    "SyncStore": "sync",
+    "TaxonomyCatalog": "catalog",
+    "FilterRegistry": "filters",
+    "ProjectJoin": "joins",
+    "FishBiomass": "aggregation",
+    "BenthicCover": "aggregation",
+    "QuadratCover": "aggregation",
+    "TokenBucket": "utilities",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
@@ -0,0 +1,309 @@
+import operator
+from abc import ABC, abstractmethod
+
+from .joins import OBSERVATION_RELATIONS
+
+# Square metres per hectare.
+M2_PER_HA = 10000
+# Levels observations are rolled up to, from finest to coarsest.
+LEVELS = ("sample_unit", "sample_event", "site", "project")
+# Method, method resource, sample unit resource and unit key of the observation resources that can be aggregated, see
+# OBSERVATION_RELATIONS.
+OBSERVATION_METHODS = {
+    observation: OBSERVATION_RELATIONS[observation]
+    for observation in ("obstransectbeltfishs", "obsbenthicpits", "obsbenthiclits", "obsquadratbenthicpercent")
+}
+# Belt transect width condition operators.
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+}
+
+
+def sample_unit_index(
+    methods, sample_units, sample_events, unit_key: str = "transect", project: str = None
+):
+    """
+    Indexes sample unit methods by id with their sample unit, sample event, site and project, eg. for
+    beltfishtransectmethods -> fishbelttransects -> sampleevents.
+    :param methods: sample unit method records.
+    :param sample_units: sample unit records.
+    :param sample_events: sample event records.
+    :param unit_key: (optional) method record key of its sample unit id. Defaults to (unit_key='transect').
+    :type unit_key: str
+    :param project: (optional) MERMAID project ID. Defaults to the 'project_id' tag of bulk records.
+    :type project: str
+    :return: dict of sample unit info by method id.
+    :rtype: dict
+    """
+    units = {unit.get("id"): unit for unit in sample_units}
+    events = {event.get("id"): event for event in sample_events}
+
+    index = {}
+    for method in methods:
+        unit = units.get(method.get(unit_key)) or {}
+        event = events.get(unit.get("sample_event")) or {}
+        index[method.get("id")] = {
+            "sample_unit": unit.get("id"),
+            "sample_event": event.get("id"),
+            "site": event.get("site"),
+            "project": project or method.get("project_id"),
+            "len_surveyed": unit.get("len_surveyed"),
+            "width": unit.get("width"),
+        }
+    return index
+
+
+def belt_width(width, size: float = None):
+    """
+    Gets the width of a belt transect in metres for a fish size.
+    :param width: width in metres, or belt transect width conditions eg. [{'val': 5, 'operator': '<', 'size': 35},
+    {'val': 20, 'operator': '>=', 'size': 35}] from the belttransectwidths choices.
+    :param size: (optional) fish size in cm.
+    :type size: float
+    :return: width in metres, None if no condition applies.
+    :rtype: float
+    """
+    if width is None or isinstance(width, (int, float)):
+        return width
+
+    default = None
+    for condition in width:
+        compare = _OPERATORS.get(condition.get("operator"))
+        if compare is None or condition.get("size") is None:
+            default = condition.get("val")
+        elif size is not None and compare(size, condition["size"]):
+            return condition.get("val")
+    return default
+
+
+def _mean(metrics: list, missing=None):
+    # Mean of each metric, nested dicts are averaged per key with missing keys counted as 0.
+    mean = {}
+    for key in dict.fromkeys(key for values in metrics for key in values):
+        values = [values.get(key, missing) for values in metrics]
+        if any(isinstance(value, dict) for value in values):
+            mean[key] = _mean([value or {} for value in values], missing=0)
+        else:
+            values = [value for value in values if value is not None]
+            mean[key] = sum(values) / len(values) if values else None
+    return mean
+
+
+class Aggregator(ABC):
+    """
+    Incrementally reduces observations to metrics per sample unit, rolled up to sample events, sites and projects as
+    the mean of their children. Observations are consumed as they arrive, eg. page by page from iter_observations,
+    only a running total per sample unit is kept.
+
+        aggregator = FishBiomass(catalog, sample_units).add(client.iter_observations(...))
+        aggregator.rollup("site")
+    """
+
+    # Observation key of its sample unit method id.
+    method_key = None
+    # Rolls up only sample units having observations, eg. when observations were filtered.
+    observed_only = False
+
+    def __init__(self, sample_units: dict):
+        """
+        :param sample_units: sample unit info by method id, see sample_unit_index.
+        :type sample_units: dict
+        """
+        self.sample_units = sample_units
+        self._totals = {}
+
+    def add(self, observations):
+        """
+        Adds observations to the running totals.
+        :param observations: iterable of observations, eg. a page of results or a generator.
+        :return: self.
+        :rtype: Aggregator
+        """
+        for observation in observations:
+            method = observation.get(self.method_key)
+            totals = self._totals.get(method)
+            if totals is None:
+                totals = self._totals[method] = self._start(method)
+            self._accumulate(totals, observation)
+        return self
+
+    def _start(self, method: str):
+        return {}
+
+    @abstractmethod
+    def _accumulate(self, totals: dict, observation: dict):
+        pass
+
+    @abstractmethod
+    def _finish(self, totals: dict):
+        pass
+
+    def rollup(self, level: str = "sample_unit"):
+        """
+        Gets metrics at a level, averaged over the sample units, sample events or sites below it.
+        :param level: (optional) sample_unit, sample_event, site or project. Defaults to (level='sample_unit').
+        :type level: str
+        :return: dict of metrics by id at the level. Sample units are keyed by method id.
+        :rtype: dict
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Invalid level: {level}")
+
+        # Sample units without observations are included, eg. with 0 biomass, unless observed_only.
+        methods = self._totals if self.observed_only else [*self.sample_units, *self._totals]
+        metrics = {
+            method: self._finish(self._totals.get(method) or self._start(method))
+            for method in dict.fromkeys(methods)
+        }
+        parents = {}
+        for method, unit in self.sample_units.items():
+            parents[("sample_event", method)] = unit.get("sample_event")
+            parents[("site", unit.get("sample_event"))] = unit.get("site")
+            parents[("project", unit.get("site"))] = unit.get("project")
+
+        for parent_level in LEVELS[1 : LEVELS.index(level) + 1]:
+            children = {}
+            for key, values in metrics.items():
+                children.setdefault(parents.get((parent_level, key)), []).append(values)
+            metrics = {key: _mean(values) for key, values in children.items()}
+        return metrics
+
+
+class FishBiomass(Aggregator):
+    """
+    Fish biomass in kg/ha per sample unit, in total and per trophic group, from belt fish observations. Each
+    observation weighs count * a * (size * c) ^ b grams with the biomass constants of its fish attribute, or of its
+    closest ancestor having them, over the transect area at the belt width for its size.
+    """
+
+    method_key = "beltfish"
+
+    def __init__(self, catalog, sample_units: dict, widths: dict = None):
+        """
+        :param catalog: taxonomy catalog of fish attributes.
+        :type catalog: TaxonomyCatalog
+        :param sample_units: sample unit info by beltfishtransectmethods id, see sample_unit_index.
+        :type sample_units: dict
+        :param widths: (optional) belt transect width in metres, or width conditions, by width id. Sample unit widths
+        that are numbers are used as is.
+        :type widths: dict
+        """
+        super().__init__(sample_units)
+        self.catalog = catalog
+        self.widths = widths or {}
+        # Biomass constants and trophic group by fish attribute id, resolved once per taxon.
+        self._taxa = {}
+
+    def _taxon(self, id: str):
+        taxon = self._taxa.get(id)
+        if taxon is None:
+            lineage = self.catalog.fish_lineage(id)
+            constants = next(
+                (
+                    (t.biomass_constant_a, t.biomass_constant_b, t.biomass_constant_c or 1)
+                    for t in lineage
+                    if t.biomass_constant_a is not None and t.biomass_constant_b is not None
+                ),
+                None,
+            )
+            group = next((t.trophic_group for t in lineage if t.trophic_group), None)
+            taxon = self._taxa[id] = (constants, group)
+        return taxon
+
+    def _start(self, method: str):
+        unit = self.sample_units.get(method) or {}
+        width = unit.get("width")
+        return {
+            "length": unit.get("len_surveyed"),
+            "width": self.widths.get(width, width) if isinstance(width, str) else width,
+            "biomass": 0.0,
+            "groups": {},
+        }
+
+    def _accumulate(self, totals: dict, observation: dict):
+        constants, group = self._taxon(observation.get("fish_attribute"))
+        size = observation.get("size")
+        width = belt_width(totals["width"], size)
+        if constants is None or size is None or not width or not totals["length"]:
+            return
+
+        a, b, c = constants
+        grams = (observation.get("count") or 0) * a * (size * c) ** b
+        kgha = grams / 1000 / (totals["length"] * width) * M2_PER_HA
+        totals["biomass"] += kgha
+        totals["groups"][group] = totals["groups"].get(group, 0.0) + kgha
+
+    def _finish(self, totals: dict):
+        return {"biomass_kgha": totals["biomass"], "biomass_kgha_by_trophic_group": dict(totals["groups"])}
+
+
+class BenthicCover(Aggregator):
+    """
+    Percent cover of top level benthic categories per sample unit, eg. 'Hard coral', from benthic PIT observations,
+    one point each, or benthic LIT observations weighted by length.
+    """
+
+    def __init__(self, catalog, sample_units: dict, observation: str = "obsbenthicpits"):
+        """
+        :param catalog: taxonomy catalog of benthic attributes.
+        :type catalog: TaxonomyCatalog
+        :param sample_units: sample unit info by method id, see sample_unit_index.
+        :type sample_units: dict
+        :param observation: (optional) obsbenthicpits or obsbenthiclits. Defaults to (observation='obsbenthicpits').
+        :type observation: str
+        """
+        if observation not in ("obsbenthicpits", "obsbenthiclits"):
+            raise ValueError(f"Invalid observation: {observation}")
+        super().__init__(sample_units)
+        self.catalog = catalog
+        self.method_key = OBSERVATION_METHODS[observation][0]
+        self.weight_key = "length" if observation == "obsbenthiclits" else None
+        # Category name by benthic attribute id, resolved once per attribute.
+        self._categories = {}
+
+    def _category(self, id: str):
+        if id not in self._categories:
+            category = self.catalog.benthic_category(id)
+            self._categories[id] = category.name if category else None
+        return self._categories[id]
+
+    def _accumulate(self, totals: dict, observation: dict):
+        weight = 1
+        if self.weight_key:
+            weight = observation.get(self.weight_key) or 0
+        category = self._category(observation.get("attribute"))
+        totals[category] = totals.get(category, 0) + weight
+
+    def _finish(self, totals: dict):
+        total = sum(totals.values())
+        return {
+            "percent_cover": {
+                category: 100 * weight / total for category, weight in totals.items()
+            }
+            if total
+            else {}
+        }
+
+
+class QuadratCover(Aggregator):
+    """
+    Mean percent hard coral, soft coral and macroalgae cover of the quadrats of each bleaching quadrat collection,
+    from obsquadratbenthicpercent observations.
+    """
+
+    method_key = "bleachingquadratcollection"
+    # Observation percent cover fields.
+    fields = ("percent_hard", "percent_soft", "percent_algae")
+
+    def _accumulate(self, totals: dict, observation: dict):
+        totals["quadrats"] = totals.get("quadrats", 0) + 1
+        for field in self.fields:
+            totals[field] = totals.get(field, 0) + (observation.get(field) or 0)
+
+    def _finish(self, totals: dict):
+        quadrats = totals.get("quadrats") or 1
+        return {field: totals.get(field, 0) / quadrats for field in self.fields}
@@ -0,0 +1,721 @@
+import asyncio
+from collections import deque
+from urllib.parse import urlsplit
+
+from .client import BaseClient
+from .utilities import *
+from .exceptions import *
+
+
+class AsyncClient(BaseClient):
+    """
+    asyncio client for accessing MERMAID API. Mirrors the Client API with coroutines and async generators, sharing
+    one non-blocking connection pool across every call.
+
+    httpx is imported, and the connection pool created, on the first call, so importing and constructing an
+    AsyncClient stay cheap.
+
+    Use as an async context manager, or call aclose() when done:
+
+        async with AsyncClient(token=token) as client:
+            events = await asyncio.gather(*(client.fetch_all(...) for ...))
+    """
+
+    def __init__(
+        self,
+        token: str = None,
+        url: str = BaseClient.API_DEV_URL,
+        *args,
+        max_connections: int = 100,
+        max_connections_per_host: int = 10,
+        max_inflight_pages: int = None,
+        project_index_ttl: float = 300,
+        timeout: float = 10,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 60,
+        single_flight: bool = True,
+        **kwargs,
+    ):
+        """
+        :param token: (optional) Authenticated JWT token. Defaults to (token=None).
+        :type token: str
+        :param url: (optional) API URL. Defaults to (url='https://dev-api.datamermaid.org/v1/').
+        :type url: str
+        :param max_connections: (optional) Size of the connection pool. Defaults to (max_connections=100).
+        :type max_connections: int
+        :param max_connections_per_host: (optional) Maximum concurrent requests per host. Defaults to
+        (max_connections_per_host=10).
+        :type max_connections_per_host: int
+        :param max_inflight_pages: (optional) Maximum number of prefetched pages held in memory waiting to be consumed.
+        Defaults to 2 * max_connections_per_host.
+        :type max_inflight_pages: int
+        :param project_index_ttl: (optional) Seconds before the project name/id index is rebuilt, None to keep it until
+        invalidate_project_index is called. Defaults to (project_index_ttl=300).
+        :type project_index_ttl: float
+        :param timeout: (optional) Request timeout in seconds. Defaults to (timeout=10).
+        :type timeout: float
+        :param retries: (optional) Retries of requests failing with 429, 5xx, connection errors or timeouts. Defaults to
+        (retries=3).
+        :type retries: int
+        :param backoff_factor: (optional) Base delay in seconds of exponential backoff with jitter between retries,
+        unless the response gives Retry-After. Defaults to (backoff_factor=0.5).
+        :type backoff_factor: float
+        :param backoff_max: (optional) Maximum backoff delay in seconds. Responses asking to Retry-After longer raise
+        instead of waiting. Defaults to (backoff_max=60).
+        :type backoff_max: float
+        :param single_flight: (optional) Coalesces identical requests made concurrently by several tasks into one,
+        every caller getting the shared decoded response. Defaults to (single_flight=True).
+        :type single_flight: bool
+        :return AsyncClient class object.
+        """
+        self.url = url
+        self.token = token
+        self.authenticated = False
+        self.max_connections_per_host = max_connections_per_host
+        self.max_inflight_pages = max_inflight_pages or 2 * max_connections_per_host
+        self.project_index_ttl = project_index_ttl
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.single_flight = single_flight
+        # Running request tasks by URL, for single flight.
+        self._inflight = {}
+
+        if token:
+            self.authenticated = True
+
+        # Per host semaphores are created lazily, inside the running event loop.
+        self._host_semaphores = {}
+
+        # Project name/id index, built on first name lookup. Its lock is created inside the running event loop.
+        self._project_index = None
+        self._project_index_built = 0
+        self._project_index_lock = None
+
+        # httpx AsyncClient, created on first use with these options, see session.
+        self._session = None
+        self._session_options = {"max_connections": max_connections, "timeout": timeout}
+
+    @property
+    def session(self):
+        """
+        httpx AsyncClient of all AsyncClient MERMAID API calls, created on first use.
+        :rtype: httpx.AsyncClient
+        """
+        if self._session is None:
+            self._session = self._create_session(**self._session_options)
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def _create_session(self, max_connections: int, timeout: float):
+        import httpx
+
+        # Initializes httpx AsyncClient and assigns headers for all AsyncClient MERMAID API calls.
+        return httpx.AsyncClient(
+            headers={
+                "content-type": "application/json",
+                "authorization": "Bearer %s" % self.token,
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Closes the connection pool, if one was created.
+        """
+        if self._session is not None:
+            await self._session.aclose()
+
+    def _host_semaphore(self, url: str):
+        host = urlsplit(url).hostname
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_semaphores[host]
+
+    # API paths
+    async def _fetch_resource(self, resource: str, parameters=None):
+        """
+        Prepares API call and uses AsyncClient session to make MERMAID API calls.
+        :param resource: (optional) resource path. Defaults to (resource=None).
+        :type resource: str
+        :param parameters: (optional) parameters for request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :return: JSON object containing MERMAID API data.
+        :rtype: dict
+        """
+        # Creates full URL path.
+        resource = resource.strip("/ ")
+        prep_url = "/".join([self.url, resource])
+
+        return await self._fetch_url(prep_url, parameters=parameters, resource=resource)
+
+    async def _fetch_url(self, url: str, parameters=None, resource: str = None):
+        """
+        Uses AsyncClient session to make a MERMAID API call to a full URL, eg. the 'next' link of a paginated response.
+        :param url: full URL including API root.
+        :type url: str
+        :param parameters: (optional) parameters for request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :param resource: (optional) resource path used in exception messages. Defaults to url.
+        :type resource: str
+        :return: JSON object containing MERMAID API data.
+        :rtype: dict
+        """
+        resource = resource or url
+
+        if not self.single_flight:
+            return await self._get(url, parameters, resource)
+
+        key = str(self.session.build_request("GET", url, params=parameters).url)
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(
+                self._get(url, parameters, resource)
+            )
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded, so a cancelled caller doesn't cancel the request other callers wait for.
+        return await asyncio.shield(task)
+
+    async def _get(self, url: str, parameters, resource: str):
+        """
+        Sends a GET request and decodes the response.
+        :return: JSON object containing MERMAID API data.
+        :rtype: dict
+        """
+        resp = await self._get_with_retries(url, parameters, resource)
+
+        # Returns JSON if response code OK.
+        if resp.status_code == 200:
+            return resp.json()
+        elif resp.status_code == 401:
+            raise UnauthorizedClientException(code=resp.status_code)
+        elif resp.status_code == 404:
+            raise InvalidResourceException(resource=resource, code=resp.status_code)
+        else:
+            raise FatalResponseException(resource=resource, code=resp.status_code)
+
+    async def _get_with_retries(self, url: str, parameters, resource: str):
+        """
+        Sends a GET request, retrying rate limited (429) and transient (5xx) responses, connection errors and timeouts
+        with exponential backoff, honoring Retry-After up to backoff_max. See Client._send_with_retries.
+        :return: response, with a non retryable status code.
+        :rtype: httpx.Response
+        """
+        import httpx
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._host_semaphore(url):
+                    resp = await self.session.get(url, params=parameters)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise RetryableResponseException(resource=resource, message=str(e)) from e
+                await asyncio.sleep(
+                    backoff_delay(attempt, self.backoff_factor, self.backoff_max)
+                )
+                continue
+
+            if resp.status_code not in RETRY_STATUS_CODES:
+                return resp
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            # Retry-After longer than backoff_max is left to the caller, rather than blocking for it.
+            if attempt == self.retries or (retry_after is not None and retry_after > self.backoff_max):
+                if resp.status_code == 429:
+                    raise RateLimitedException(resource=resource, retry_after=retry_after)
+                raise RetryableResponseException(
+                    resource=resource, code=resp.status_code, retry_after=retry_after
+                )
+            if retry_after is None:
+                retry_after = backoff_delay(attempt, self.backoff_factor, self.backoff_max)
+            await asyncio.sleep(retry_after)
+
+    # Pagination.
+    async def _iter_pages(self, resource: str, parameters=None):
+        """
+        Lazily fetches each page of a resource, following the 'next' link of paginated responses. When the first page
+        gives the record count, the remaining pages are fetched concurrently and yielded in order.
+        :param resource: resource path.
+        :type resource: str
+        :param parameters: (optional) parameters for the first request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :return: async generator of JSON pages.
+        :rtype: async generator
+        """
+        page = await self._fetch_resource(resource, parameters=parameters)
+        yield page
+
+        if not isinstance(page, dict) or not page.get("next"):
+            return
+
+        urls = page_urls(page["next"], page.get("count"), len(page.get("results") or []))
+
+        if urls:
+            inflight = deque()
+            try:
+                for url in urls:
+                    inflight.append(
+                        asyncio.ensure_future(self._fetch_url(url, resource=resource))
+                    )
+                    if len(inflight) >= self.max_inflight_pages:
+                        yield await inflight.popleft()
+                while inflight:
+                    yield await inflight.popleft()
+            finally:
+                for task in inflight:
+                    task.cancel()
+            return
+
+        while isinstance(page, dict) and page.get("next"):
+            page = await self._fetch_url(page["next"], resource=resource)
+            yield page
+
+    async def iter_resource(self, resource: str, parameters=None, fields: list = None):
+        """
+        Lazily iterates every record of a resource across all pages.
+        :param resource: resource path eg. 'fishspecies', 'projects/<id>/obstransectbeltfishs/'.
+        :type resource: str
+        :param parameters: (optional) parameters for request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :param fields: (optional) Keeps only these fields of each record. Defaults to (fields=None), every field.
+        :type fields: list
+        :return: async generator of records.
+        :rtype: async generator
+        """
+        async for page in self._iter_pages(resource, parameters=parameters):
+            if isinstance(page, dict) and "results" in page:
+                records = page["results"]
+            elif isinstance(page, list):
+                records = page
+            else:
+                records = [page]
+            for record in records:
+                yield select_fields(record, fields) if fields else record
+
+    async def fetch_all(self, resource: str, parameters=None, fields: list = None):
+        """
+        Eagerly fetches every record of a resource across all pages.
+        :param resource: resource path eg. 'fishspecies', 'projects/<id>/obstransectbeltfishs/'.
+        :type resource: str
+        :param parameters: (optional) parameters for request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :param fields: (optional) Keeps only these fields of each record. Defaults to (fields=None), every field.
+        :type fields: list
+        :return: all records.
+        :rtype: list
+        """
+        return [
+            record
+            async for record in self.iter_resource(resource, parameters, fields=fields)
+        ]
+
+    # Get functions.
+    async def get_info(self, info: str):
+        """
+        Gets non-project resource information. See Client.get_info.
+        :param info: health, version, profiles, projecttags, sites, managements, me.
+        :type info: str
+        :return: non-project resource data.
+        :rtype: dict, str
+        """
+        self._validate_info(info)
+        return await self._fetch_resource(info)
+
+    def iter_info(self, info: str):
+        """
+        Lazily iterates every record of a non-project resource across all pages.
+        :param info: health, version, profiles, projecttags, sites, managements, me.
+        :type info: str
+        :return: async generator of non-project resource records.
+        :rtype: async generator
+        """
+        self._validate_info(info)
+        return self.iter_resource(info)
+
+    async def get_choices(self):
+        """
+        Gets a list of choice objects. See Client.get_choices.
+        :return: list of choice objects.
+        :rtype: list
+        """
+        return await self._fetch_resource("choices")
+
+    async def get_benthic_attributes(self):
+        """
+        Gets list of MERMAID benthic attributes. See Client.get_benthic_attributes.
+        :return: benthic attribute data.
+        :rtype: dict
+        """
+        return await self._fetch_resource("benthicattributes")
+
+    async def get_fish_families(self):
+        """
+        Gets list of MERMAID fish families. See Client.get_fish_families.
+        :return: fish families data.
+        :rtype: dict
+        """
+        return await self._fetch_resource("fishfamilies")
+
+    async def get_fish_genera(self):
+        """
+        Gets list of MERMAID fish genera. See Client.get_fish_genera.
+        :return: fish genera data.
+        :rtype: dict
+        """
+        return await self._fetch_resource("fishgenera")
+
+    async def get_fish_groupings(self):
+        """
+        Gets list of MERMAID fish groupings. See Client.get_fish_groupings.
+        :return: fish groupings data.
+        :rtype: dict
+        """
+        return await self._fetch_resource("fishgroupings")
+
+    async def get_fish_species(self):
+        """
+        Gets list of MERMAID fish species. See Client.get_fish_species.
+        :return: fish species data.
+        :rtype: dict
+        """
+        return await self._fetch_resource("fishspecies")
+
+    async def get_fish_sizes(self):
+        """
+        Gets list of MERMAID fish sizes. See Client.get_fish_sizes.
+        :return: fish sizes data.
+        :rtype: dict
+        """
+        return await self._fetch_resource("fishsizes")
+
+    async def get_projects(self, showall: bool = False):
+        """
+        Gets the projects resource. See Client.get_projects.
+        :param showall: (optional) Returns all projects unfiltered by the user’s membership.
+        :type showall: bool
+        :return: projects.
+        :rtype: dict
+        """
+        payload = None
+        if showall:
+            payload = "showall"
+        return await self._fetch_resource("projects", parameters=payload)
+
+    def iter_projects(self, showall: bool = False):
+        """
+        Lazily iterates every project across all pages of the projects resource.
+        :param showall: (optional) Returns all projects unfiltered by the user’s membership.
+        :type showall: bool
+        :return: async generator of projects.
+        :rtype: async generator
+        """
+        payload = None
+        if showall:
+            payload = "showall"
+        return self.iter_resource("projects", parameters=payload)
+
+    async def get_project(self, id: str = None, name: str = None):
+        """
+        Gets a specific MERMAID project. Either name or id required. See Client.get_project.
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :return: project with associated data.
+        :rtype: dict
+        """
+        if id:
+            return await self.get_project_resource(id=id)
+        elif name:
+            return await self.lookup_project(name=name)
+
+    # Project index.
+    async def _get_project_index(self):
+        """
+        Gets the project index, building it from all pages of projects?showall when missing or older than
+        project_index_ttl. Concurrent lookups wait for one build.
+        :return: dict of projects by 'name' and by 'id'.
+        :rtype: dict
+        """
+        if self._project_index_lock is None:
+            self._project_index_lock = asyncio.Lock()
+        async with self._project_index_lock:
+            if self._project_index_stale():
+                self._set_project_index(
+                    [project async for project in self.iter_projects(showall=True)]
+                )
+            return self._project_index
+
+    async def lookup_project(self, id: str = None, name: str = None):
+        """
+        Looks up a project listing in the project index. See Client.lookup_project.
+        :return: project from the projects list.
+        :rtype: dict
+        """
+        return self._find_project(await self._get_project_index(), id=id, name=name)
+
+    async def get_project_id(self, name: str):
+        """
+        Gets an ID for given MERMAID project.
+        :param name: MERMAID project name.
+        :type: str
+        :return: project ID.
+        :rtype: str
+        """
+        return (await self.lookup_project(name=name)).get("id")
+
+    async def _project_path(self, resource: str = None, id: str = None, name: str = None):
+        """
+        Generates project resource path favoring id for path creation over name parameter.
+        :return: resource path eg. 'projects/<id>/<resource>/'.
+        :rtype: str
+        """
+        path = ""
+        if id or name:
+            path = "projects/"
+        p_id = id
+        # If id not given then get the id from project name
+        if name and p_id is None:
+            p_id = await self.get_project_id(name=name)
+        if p_id:
+            path = f"{path}{p_id}/"
+        if resource:
+            path = f"{path}{resource}/"
+        return path
+
+    async def get_project_resource(
+        self,
+        resource: str = None,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val=None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Gets project resource data including; resources and observations. See Client.get_project_resource.
+        :return: project data.
+        :rtype: dict
+        """
+        path = await self._project_path(resource=resource, id=id, name=name)
+        payload = build_payload(filter, filter_val, self._request_filters(filters, fields))
+
+        return select_page_fields(
+            await self._fetch_resource(resource=path, parameters=payload), fields
+        )
+
+    async def iter_project_resource(
+        self,
+        resource: str = None,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val=None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every record of a project resource across all pages. Takes the same arguments as
+        get_project_resource.
+        :return: async generator of project resource records.
+        :rtype: async generator
+        """
+        path = await self._project_path(resource=resource, id=id, name=name)
+        payload = build_payload(filter, filter_val, self._request_filters(filters, fields))
+
+        async for record in self.iter_resource(path, parameters=payload, fields=fields):
+            yield record
+
+    async def get_observations(
+        self,
+        observation: str,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Gets observation resources. See Client.get_observations.
+        :return: observation data.
+        :rtype: dict
+        """
+        self._validate_observation(observation, filter, filters)
+
+        return await self.get_project_resource(
+            resource=observation,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+        )
+
+    def iter_observations(
+        self,
+        observation: str,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every observation across all pages. Takes the same arguments as get_observations.
+        :return: async generator of observations.
+        :rtype: async generator
+        """
+        self._validate_observation(observation, filter, filters)
+
+        return self.iter_project_resource(
+            resource=observation,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+        )
+
+    async def get_sample_units(
+        self,
+        unit: str,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Gets sample units. See Client.get_sample_units.
+        :return: Sample units data.
+        :rtype: dict
+        """
+        self._validate_sample_unit(unit, filter, filters)
+
+        return await self.get_project_resource(
+            resource=unit,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+        )
+
+    def iter_sample_units(
+        self,
+        unit: str,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every sample unit across all pages. Takes the same arguments as get_sample_units.
+        :return: async generator of sample units.
+        :rtype: async generator
+        """
+        self._validate_sample_unit(unit, filter, filters)
+
+        return self.iter_project_resource(
+            resource=unit,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+        )
+
+    async def get_sample_methods(self, method: str, id: str = None, name: str = None):
+        """
+        Gets sample units methods. See Client.get_sample_methods.
+        :return: Sample units methods data.
+        :rtype: dict
+        """
+        self._validate_sample_method(method)
+
+        return await self.get_project_resource(resource=method, id=id, name=name)
+
+    def iter_sample_methods(self, method: str, id: str = None, name: str = None):
+        """
+        Lazily iterates every sample unit method across all pages. Takes the same arguments as get_sample_methods.
+        :return: async generator of sample units methods.
+        :rtype: async generator
+        """
+        self._validate_sample_method(method)
+
+        return self.iter_project_resource(resource=method, id=id, name=name)
+
+    async def get_sample_events(
+        self,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: str = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Gets sample events. See Client.get_sample_events.
+        :return: sample events data.
+        """
+        self._validate_sample_event(filter, filters)
+
+        return await self.get_project_resource(
+            resource="sampleevents",
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+        )
+
+    def iter_sample_events(
+        self,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: str = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every sample event across all pages. Takes the same arguments as get_sample_events.
+        :return: async generator of sample events.
+        :rtype: async generator
+        """
+        self._validate_sample_event(filter, filters)
+
+        return self.iter_project_resource(
+            resource="sampleevents",
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+        )
@@ -0,0 +1,308 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CachePolicy:
+    """
+    Caching policy for a MERMAID API resource.
+    """
+
+    def __init__(self, ttl: float = None, revalidate: bool = True):
+        """
+        :param ttl: (optional) Seconds a cached response is served without contacting the API. Defaults to (ttl=None),
+        every use is revalidated.
+        :type ttl: float
+        :param revalidate: (optional) Revalidates stale responses with conditional requests (ETag/Last-Modified)
+        instead of downloading them again. Defaults to (revalidate=True).
+        :type revalidate: bool
+        """
+        self.ttl = ttl
+        self.revalidate = revalidate
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of MERMAID API responses, stored in SQLite. Responses are keyed on URL, parameters and
+    auth identity, revalidated with conditional requests once stale, and evicted by age and total size.
+    """
+
+    # Reference resources rarely change between runs.
+    DEFAULT_POLICIES = {
+        "choices": CachePolicy(ttl=24 * 60 * 60),
+        "benthicattributes": CachePolicy(ttl=24 * 60 * 60),
+        "fishfamilies": CachePolicy(ttl=24 * 60 * 60),
+        "fishgenera": CachePolicy(ttl=24 * 60 * 60),
+        "fishgroupings": CachePolicy(ttl=24 * 60 * 60),
+        "fishsizes": CachePolicy(ttl=24 * 60 * 60),
+        "fishspecies": CachePolicy(ttl=24 * 60 * 60),
+    }
+
+    def __init__(
+        self,
+        path: str = "~/.cache/mermaid-py/responses.sqlite",
+        max_size: int = 100 * 1024 * 1024,
+        max_age: float = 30 * 24 * 60 * 60,
+        policies: dict = None,
+        default_policy: CachePolicy = None,
+    ):
+        """
+        :param path: (optional) SQLite database file. Defaults to (path='~/.cache/mermaid-py/responses.sqlite').
+        :type path: str
+        :param max_size: (optional) Maximum total size of cached bodies in bytes, least recently used entries are
+        evicted first. Defaults to 100 MB.
+        :type max_size: int
+        :param max_age: (optional) Seconds after which unused entries are evicted. Defaults to 30 days.
+        :type max_age: float
+        :param policies: (optional) CachePolicy per resource eg. {'fishspecies': CachePolicy(ttl=3600)}, merged over
+        DEFAULT_POLICIES. A None policy disables caching of that resource.
+        :type policies: dict
+        :param default_policy: (optional) CachePolicy for resources without a policy. Defaults to (default_policy=None),
+        those resources are not cached.
+        :type default_policy: CachePolicy
+        :return ResponseCache class object.
+        """
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self.max_age = max_age
+        self.policies = dict(self.DEFAULT_POLICIES, **(policies or {}))
+        self.default_policy = default_policy
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # One connection shared across threads, serialized by the lock.
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+
+    def policy(self, resource: str):
+        """
+        Gets the caching policy for a resource.
+        :param resource: resource path eg. 'fishspecies'.
+        :type resource: str
+        :return: policy, None if the resource isn't cached.
+        :rtype: CachePolicy
+        """
+        return self.policies.get(resource.strip("/ "), self.default_policy)
+
+    @staticmethod
+    def key(url: str, token: str = None):
+        """
+        Gets the cache key of a request.
+        :param url: full request URL including parameters.
+        :type url: str
+        :param token: (optional) JWT token identifying the caller.
+        :type token: str
+        :return: cache key.
+        :rtype: str
+        """
+        return hashlib.sha256(f"{url}\n{token or ''}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Gets a cached response.
+        :param key: cache key.
+        :type key: str
+        :return: dict with body, etag, last_modified and stored_at, None if not cached.
+        :rtype: dict
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        body, etag, last_modified, stored_at = row
+        return {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": stored_at,
+        }
+
+    def set(self, key: str, body: bytes, etag: str = None, last_modified: str = None):
+        """
+        Stores a response and evicts entries beyond max_age and max_size.
+        :param key: cache key.
+        :type key: str
+        :param body: raw response body.
+        :type body: bytes
+        :param etag: (optional) ETag response header.
+        :type etag: str
+        :param last_modified: (optional) Last-Modified response header.
+        :type last_modified: str
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now, len(body)),
+            )
+            self._evict(now)
+
+    def touch(self, key: str):
+        """
+        Marks a cached response as fresh, eg. after a 304 Not Modified revalidation.
+        :param key: cache key.
+        :type key: str
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+
+    def clear(self):
+        """
+        Deletes every cached response.
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def _evict(self, now: float):
+        if self.max_age is not None:
+            self._db.execute(
+                "DELETE FROM responses WHERE accessed_at < ?", (now - self.max_age,)
+            )
+
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_size:
+            return
+
+        # Evicts least recently used entries until under max_size.
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU cache of decoded MERMAID API responses with a TTL per resource. Cached data is shared
+    between callers and should be treated as read-only.
+    """
+
+    # Reference resources served from memory, with their TTL in seconds.
+    DEFAULT_TTLS = {
+        "choices": 60 * 60,
+        "benthicattributes": 60 * 60,
+        "fishfamilies": 60 * 60,
+        "fishgenera": 60 * 60,
+        "fishgroupings": 60 * 60,
+        "fishsizes": 60 * 60,
+        "fishspecies": 60 * 60,
+    }
+
+    def __init__(self, maxsize: int = 256, ttls: dict = None):
+        """
+        :param maxsize: (optional) Maximum number of cached responses. Defaults to (maxsize=256).
+        :type maxsize: int
+        :param ttls: (optional) TTL in seconds per resource eg. {'fishspecies': 600}, merged over DEFAULT_TTLS. A None
+        TTL keeps responses until evicted.
+        :type ttls: dict
+        :return MemoryCache class object.
+        """
+        self.maxsize = maxsize
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __contains__(self, resource: str):
+        return resource.strip("/ ") in self.ttls
+
+    def get(self, key, resource: str):
+        """
+        Gets a cached response.
+        :param key: cache key eg. (url, token).
+        :param resource: resource path eg. 'fishspecies'.
+        :type resource: str
+        :return: (True, data) on a hit, (False, None) on a miss.
+        :rtype: tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                data, expires = entry
+                if expires is None or time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, data
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key, data, resource: str):
+        """
+        Stores a response, evicting the least recently used one when full.
+        :param key: cache key eg. (url, token).
+        :param data: decoded response.
+        :param resource: resource path eg. 'fishspecies'.
+        :type resource: str
+        """
+        ttl = self.ttls.get(resource.strip("/ "))
+        expires = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (data, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Deletes every cached response. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Gets cache counters.
+        :return: hits, misses, evictions and current size.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,217 @@
+class FishTaxon:
+    """
+    Fish species, genus, family or grouping with its biomass constants.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "rank",
+        "parent_id",
+        "biomass_constant_a",
+        "biomass_constant_b",
+        "biomass_constant_c",
+        "trophic_group",
+        "functional_group",
+        "member_ids",
+    )
+
+    def __init__(self, record: dict, rank: str, parent_key: str = None):
+        """
+        :param record: fish attribute from the MERMAID API.
+        :type record: dict
+        :param rank: species, genus, family or grouping.
+        :type rank: str
+        :param parent_key: (optional) record key of the parent taxon id eg. 'genus' for species.
+        :type parent_key: str
+        """
+        self.id = record.get("id")
+        self.name = record.get("display_name") or record.get("name")
+        self.rank = rank
+        self.parent_id = record.get(parent_key) if parent_key else None
+        self.biomass_constant_a = record.get("biomass_constant_a")
+        self.biomass_constant_b = record.get("biomass_constant_b")
+        self.biomass_constant_c = record.get("biomass_constant_c")
+        self.trophic_group = record.get("trophic_group")
+        self.functional_group = record.get("functional_group")
+        self.member_ids = tuple(record.get("fish_attributes") or ())
+
+    def __repr__(self):
+        return f"FishTaxon(rank={self.rank!r}, name={self.name!r})"
+
+
+class BenthicAttribute:
+    """
+    Benthic attribute, eg. a coral taxon or an inorganic substrate.
+    """
+
+    __slots__ = ("id", "name", "parent_id")
+
+    def __init__(self, record: dict):
+        """
+        :param record: benthic attribute from the MERMAID API.
+        :type record: dict
+        """
+        self.id = record.get("id")
+        self.name = record.get("name")
+        self.parent_id = record.get("parent")
+
+    def __repr__(self):
+        return f"BenthicAttribute(name={self.name!r})"
+
+
+class TaxonomyCatalog:
+    """
+    Indexed lookup tables of MERMAID fish attributes and benthic attributes. Every lookup by id or name is a dict
+    access, and the species -> genus -> family hierarchy is resolved through parent ids.
+    """
+
+    def __init__(
+        self,
+        species=(),
+        genera=(),
+        families=(),
+        groupings=(),
+        benthic_attributes=(),
+    ):
+        """
+        :param species: fishspecies records.
+        :param genera: fishgenera records.
+        :param families: fishfamilies records.
+        :param groupings: fishgroupings records.
+        :param benthic_attributes: benthicattributes records.
+        :return TaxonomyCatalog class object.
+        """
+        self.fish = {}
+        self.fish_by_name = {}
+        self.benthic = {}
+        self.benthic_by_name = {}
+        # Grouping ids by member fish attribute id.
+        self._groupings_by_member = {}
+
+        for records, rank, parent_key in (
+            (families, "family", None),
+            (genera, "genus", "family"),
+            (species, "species", "genus"),
+            (groupings, "grouping", None),
+        ):
+            for record in records:
+                self._add_fish(FishTaxon(record, rank, parent_key))
+
+        for record in benthic_attributes:
+            attribute = BenthicAttribute(record)
+            self.benthic[attribute.id] = attribute
+            self.benthic_by_name.setdefault(attribute.name, attribute)
+
+    def _add_fish(self, taxon: FishTaxon):
+        self.fish[taxon.id] = taxon
+        self.fish_by_name.setdefault(taxon.name, taxon)
+        for member_id in taxon.member_ids:
+            self._groupings_by_member.setdefault(member_id, []).append(taxon.id)
+
+    @classmethod
+    def from_client(cls, client):
+        """
+        Builds a catalog from every page of the fish and benthic attribute resources.
+        :param client: MERMAID API Client.
+        :type client: Client
+        :return: TaxonomyCatalog class object.
+        """
+        return cls(
+            species=client.iter_resource("fishspecies"),
+            genera=client.iter_resource("fishgenera"),
+            families=client.iter_resource("fishfamilies"),
+            groupings=client.iter_resource("fishgroupings"),
+            benthic_attributes=client.iter_resource("benthicattributes"),
+        )
+
+    # Fish attributes.
+    def fish_lineage(self, id: str):
+        """
+        Gets a fish attribute and its ancestors, eg. [species, genus, family].
+        :param id: fish attribute ID.
+        :type id: str
+        :return: list of FishTaxon, empty if the id is unknown.
+        :rtype: list
+        """
+        lineage = []
+        taxon = self.fish.get(id)
+        while taxon is not None:
+            lineage.append(taxon)
+            taxon = self.fish.get(taxon.parent_id)
+        return lineage
+
+    def fish_rank(self, id: str, rank: str):
+        """
+        Gets the ancestor of a fish attribute at a rank, eg. the family of a species.
+        :param id: fish attribute ID.
+        :type id: str
+        :param rank: species, genus or family.
+        :type rank: str
+        :return: FishTaxon, None if not found.
+        :rtype: FishTaxon
+        """
+        for taxon in self.fish_lineage(id):
+            if taxon.rank == rank:
+                return taxon
+        return None
+
+    def fish_groupings(self, id: str):
+        """
+        Gets the groupings a fish attribute, or any of its ancestors, is a member of.
+        :param id: fish attribute ID.
+        :type id: str
+        :return: list of grouping FishTaxon.
+        :rtype: list
+        """
+        groupings = []
+        for taxon in self.fish_lineage(id):
+            for grouping_id in self._groupings_by_member.get(taxon.id, ()):
+                grouping = self.fish[grouping_id]
+                if grouping not in groupings:
+                    groupings.append(grouping)
+        return groupings
+
+    def biomass_constants(self, id: str):
+        """
+        Gets biomass constants of a fish attribute.
+        :param id: fish attribute ID.
+        :type id: str
+        :return: (a, b, c), None if the id is unknown.
+        :rtype: tuple
+        """
+        taxon = self.fish.get(id)
+        if taxon is None:
+            return None
+        return (
+            taxon.biomass_constant_a,
+            taxon.biomass_constant_b,
+            taxon.biomass_constant_c,
+        )
+
+    # Benthic attributes.
+    def benthic_lineage(self, id: str):
+        """
+        Gets a benthic attribute and its ancestors, ending with its top level category.
+        :param id: benthic attribute ID.
+        :type id: str
+        :return: list of BenthicAttribute, empty if the id is unknown.
+        :rtype: list
+        """
+        lineage = []
+        attribute = self.benthic.get(id)
+        while attribute is not None and attribute not in lineage:
+            lineage.append(attribute)
+            attribute = self.benthic.get(attribute.parent_id)
+        return lineage
+
+    def benthic_category(self, id: str):
+        """
+        Gets the top level category of a benthic attribute, eg. 'Hard coral'.
+        :param id: benthic attribute ID.
+        :type id: str
+        :return: BenthicAttribute, None if the id is unknown.
+        :rtype: BenthicAttribute
+        """
+        lineage = self.benthic_lineage(id)
+        return lineage[-1] if lineage else None
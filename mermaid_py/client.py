@@ -1,11 +1,38 @@
-import requests
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
 from .utilities import *
 from .exceptions import *
+from .aggregation import (
+    OBSERVATION_METHODS,
+    BenthicCover,
+    FishBiomass,
+    QuadratCover,
+    sample_unit_index,
+)
+from .catalog import TaxonomyCatalog
+from .filters import REGISTRY
+from .joins import OBSERVATION_RELATIONS, ProjectJoin
+from .columnar import (
+    FORMATS,
+    partition_path,
+    read_checkpoint,
+    remove_parts,
+    write_checkpoint,
+    write_dataset,
+    write_part,
+)
+from .frames import to_output
+from .decoding import StreamedPage, loads
+from .metrics import Metrics
 
 
-class Client:
+class BaseClient:
     """
-    Client base class for accessing MERMAID API.
+    Resources and validation shared by the MERMAID API clients.
     """
 
     # Production MERMAID API root URL.
@@ -58,38 +85,316 @@ class Client:
         "sampleunitmethods",
     ]
 
-    def __init__(self, token: str = None, url: str = API_DEV_URL, *args, **kwargs):
+    # Supported filters per resource, see filters.FilterRegistry.
+    filter_registry = REGISTRY
+    # Query parameter of server-side field projection, None while the API has none and fields are dropped by the
+    # client. Set it, eg. to 'fields', for APIs taking ?fields=a,b.
+    fields_parameter = None
+    # Maximum worker threads of bulk getters fetching many projects at once, unless max_workers is given.
+    bulk_max_workers = 8
+
+    def _request_filters(self, filters: dict = None, fields: list = None):
+        """
+        Adds the requested fields to the filters sent to the API, when it supports field projection.
+        :return: filters.
+        :rtype: dict
+        """
+        if fields and self.fields_parameter:
+            filters = dict(filters or {}, **{self.fields_parameter: ",".join(fields)})
+        return filters
+
+    # Validation.
+    def _validate_info(self, info: str):
+        if info == "me" and not self.authenticated:
+            raise UnauthorizedClientException(
+                message='Authentication required for access to "me" endpoint'
+            )
+        if info not in self.non_project_resources:
+            raise InvalidResourceException(resource=info)
+
+    def _validate_observation(
+        self, observation: str, filter: str = None, filters: dict = None
+    ):
+        if observation not in self.project_observations:
+            raise InvalidResourceException(resource=observation)
+        self.filter_registry.validate(observation, filter_names(filter, filters))
+
+    def _validate_sample_unit(
+        self, unit: str, filter: str = None, filters: dict = None
+    ):
+        if unit not in self.project_sample_units_methods:
+            raise InvalidResourceException(resource=unit)
+        self.filter_registry.validate(unit, filter_names(filter, filters))
+
+    def _validate_sample_method(self, method: str):
+        if method not in self.project_sample_units_methods:
+            raise InvalidResourceException(resource=method)
+
+    def _validate_sample_event(self, filter: str = None, filters: dict = None):
+        self.filter_registry.validate("sampleevents", filter_names(filter, filters))
+
+    # Project index.
+    def _project_index_stale(self):
+        # True when the project index is missing or older than project_index_ttl.
+        return self._project_index is None or (
+            self.project_index_ttl is not None
+            and time.monotonic() - self._project_index_built > self.project_index_ttl
+        )
+
+    def _set_project_index(self, projects):
+        """
+        Builds the project index from project listings.
+        :param projects: iterable of projects eg. from projects?showall.
+        :return: dict of projects by 'name' and by 'id'.
+        :rtype: dict
+        """
+        index = {"name": {}, "id": {}}
+        for project in projects:
+            index["id"][project.get("id")] = project
+            # Favors the first listed project when names are duplicated.
+            index["name"].setdefault(project.get("name"), project)
+        self._project_index = index
+        self._project_index_built = time.monotonic()
+        return index
+
+    def _find_project(self, index: dict, id: str = None, name: str = None):
+        project = index["id"].get(id) if id else index["name"].get(name)
+        if project:
+            return project
+        raise InvalidProjectException(id=id, name=name)
+
+    def invalidate_project_index(self):
+        """
+        Discards the project index so the next name lookup rebuilds it.
+        """
+        self._project_index = None
+
+
+class Client(BaseClient):
+    """
+    Client base class for accessing MERMAID API.
+
+    A Client can be shared across threads, its requests Session only sends requests after construction. Threads share
+    one connection pool per host, give it at least as many connections as threads with pool_maxsize.
+
+    requests is imported, and the Session created, on the first call, so importing and constructing a Client stay
+    cheap, eg. for CLI tools and serverless functions.
+    """
+
+    def __init__(
+        self,
+        token: str = None,
+        url: str = BaseClient.API_DEV_URL,
+        *args,
+        max_workers: int = 1,
+        max_inflight_pages: int = None,
+        project_index_ttl: float = 300,
+        cache=None,
+        memory_cache=None,
+        stream: bool = False,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 60,
+        connect_timeout: float = 10,
+        read_timeout: float = 10,
+        rate_limiter: TokenBucket = None,
+        single_flight: bool = True,
+        pool_connections: int = 10,
+        pool_maxsize: int = None,
+        pool_block: bool = False,
+        compression: bool = True,
+        keep_alive: bool = True,
+        transport=None,
+        **kwargs,
+    ):
         """
         :param token: (optional) Authenticated JWT token. Defaults to (token=None).
         :type token: str
         :param url: (optional) API URL. Defaults to (url='https://dev-api.datamermaid.org/v1/').
         :type url: str
+        :param max_workers: (optional) Number of threads used to prefetch pages of paginated resources. Defaults to
+        (max_workers=1), fetching pages one at a time.
+        :type max_workers: int
+        :param max_inflight_pages: (optional) Maximum number of prefetched pages held in memory waiting to be consumed.
+        Defaults to 2 * max_workers.
+        :type max_inflight_pages: int
+        :param project_index_ttl: (optional) Seconds before the project name/id index is rebuilt, None to keep it until
+        invalidate_project_index is called. Defaults to (project_index_ttl=300).
+        :type project_index_ttl: float
+        :param cache: (optional) ResponseCache storing responses on disk per its resource policies. Defaults to
+        (cache=None), responses aren't cached.
+        :type cache: ResponseCache
+        :param memory_cache: (optional) MemoryCache serving reference resources, eg. fishspecies and choices, from
+        memory. Defaults to (memory_cache=None), every call makes a request.
+        :type memory_cache: MemoryCache
+        :param stream: (optional) Decodes the results of paginated iter_* and fetch_all responses one at a time as they
+        arrive, instead of buffering each whole page. Defaults to (stream=False).
+        :type stream: bool
+        :param retries: (optional) Retries of requests failing with 429, 5xx, connection errors or timeouts. Defaults to
+        (retries=3).
+        :type retries: int
+        :param backoff_factor: (optional) Base delay in seconds of exponential backoff with jitter between retries,
+        unless the response gives Retry-After. Defaults to (backoff_factor=0.5).
+        :type backoff_factor: float
+        :param backoff_max: (optional) Maximum backoff delay in seconds. Responses asking to Retry-After longer raise
+        instead of waiting. Defaults to (backoff_max=60).
+        :type backoff_max: float
+        :param connect_timeout: (optional) Seconds to wait for a connection. Defaults to (connect_timeout=10).
+        :type connect_timeout: float
+        :param read_timeout: (optional) Seconds to wait between bytes of a response. Defaults to (read_timeout=10).
+        :type read_timeout: float
+        :param rate_limiter: (optional) TokenBucket taken from before every request, shared by all threads of the
+        Client, or by many clients. Defaults to (rate_limiter=None), requests aren't limited.
+        :type rate_limiter: TokenBucket
+        :param single_flight: (optional) Coalesces identical requests made concurrently by several threads into one,
+        every caller getting the shared decoded response. Streamed responses aren't shared. Defaults to
+        (single_flight=True).
+        :type single_flight: bool
+        :param pool_connections: (optional) Number of hosts whose connection pools are kept. Defaults to
+        (pool_connections=10).
+        :type pool_connections: int
+        :param pool_maxsize: (optional) Connections kept per host. Defaults to max(10, max_workers).
+        :type pool_maxsize: int
+        :param pool_block: (optional) Waits for a free connection when the pool is exhausted, instead of opening and
+        then discarding an extra one. Defaults to (pool_block=False).
+        :type pool_block: bool
+        :param compression: (optional) Accepts gzip and deflate, plus brotli when installed, compressed responses.
+        Defaults to (compression=True).
+        :type compression: bool
+        :param keep_alive: (optional) Keeps connections open between requests. Defaults to (keep_alive=True).
+        :type keep_alive: bool
+        :param transport: (optional) requests transport adapter mounted for http and https, replacing the pooled
+        HTTPAdapter built from the pool options.
+        :type transport: requests.adapters.BaseAdapter
         :return Client class object.
         """
         self.url = url
         self.token = token
         self.authenticated = False
+        self.max_workers = max_workers
+        self.max_inflight_pages = max_inflight_pages
+        self.project_index_ttl = project_index_ttl
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.stream = stream
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate_limiter = rate_limiter
+        self._single_flight = SingleFlight() if single_flight else None
+
+        # Request instrumentation, see add_hook and metrics.
+        self.metrics = Metrics()
+        self.hooks = {"pre_request": [], "post_response": [], "on_error": []}
+
+        # Project name/id index, built on first name lookup.
+        self._project_index = None
+        self._project_index_built = 0
+        self._project_index_lock = threading.Lock()
 
         if token:
             self.authenticated = True
 
+        # requests Session, created on first use with these options, see session.
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._session_options = {
+            "pool_connections": pool_connections,
+            "pool_maxsize": pool_maxsize or max(10, max_workers),
+            "pool_block": pool_block,
+            "compression": compression,
+            "keep_alive": keep_alive,
+            "transport": transport,
+        }
+
+    @property
+    def session(self):
+        """
+        requests Session of all Client MERMAID API calls, created on first use.
+        :rtype: requests.Session
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session(**self._session_options)
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def _create_session(
+        self,
+        pool_connections: int,
+        pool_maxsize: int,
+        pool_block: bool,
+        compression: bool,
+        keep_alive: bool,
+        transport=None,
+    ):
+        import requests
+
         # Initializes requests Session and assigns headers for all Client MERMAID API calls.
-        self.session = requests.Session()
-        self.session.headers.update(
+        session = requests.Session()
+        session.headers.update(
             {
                 "content-type": "application/json",
                 "authorization": "Bearer %s" % self.token,
             }
         )
+        session.headers["Accept-Encoding"] = accept_encoding() if compression else "identity"
+        session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+        # Sizes the connection pool so prefetching threads share connections instead of discarding them.
+        if transport is None:
+            transport = requests.adapters.HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            )
+        session.mount("https://", transport)
+        session.mount("http://", transport)
+        return session
+
+    # Instrumentation.
+    def add_hook(self, event: str, callback):
+        """
+        Registers a callback for request events:
+        pre_request: callback(prepared_request, resource), before each attempt is sent.
+        post_response: callback(response, resource, seconds), after each response is received.
+        on_error: callback(exception, resource), when a call fails.
+        :param event: pre_request, post_response or on_error.
+        :type event: str
+        :param callback: function called with the event arguments.
+        """
+        if event not in self.hooks:
+            raise ValueError(f"Invalid hook event: {event}")
+        self.hooks[event].append(callback)
+
+    def remove_hook(self, event: str, callback):
+        """
+        Unregisters a callback registered with add_hook.
+        :param event: pre_request, post_response or on_error.
+        :type event: str
+        :param callback: registered function.
+        """
+        self.hooks[event].remove(callback)
+
+    def _run_hooks(self, event: str, *args):
+        for callback in self.hooks[event]:
+            callback(*args)
 
     # API paths
-    def _fetch_resource(self, resource: str, parameters=None):
+    def _fetch_resource(self, resource: str, parameters=None, stream: bool = False):
         """
         Prepares API call and uses Client Session to make MERMAID API calls.
         :param resource: (optional) resource path. Defaults to (resource=None).
         :type resource: str
         :param parameters: (optional) parameters for request.
         :type parameters: dict:(../?key=val), str:(../?str).
+        :param stream: (optional) Returns paginated responses with a generator of results decoded as they arrive.
+        :type stream: bool
         :return: JSON object containing MERMAID API data.
         :rtype: dict
         """
@@ -97,22 +402,307 @@ class Client:
         resource = resource.strip("/ ")
         prep_url = "/".join([self.url, resource])
 
+        return self._fetch_url(
+            prep_url, parameters=parameters, resource=resource, stream=stream
+        )
+
+    def _fetch_url(
+        self, url: str, parameters=None, resource: str = None, stream: bool = False
+    ):
+        """
+        Uses Client Session to make a MERMAID API call to a full URL, eg. the 'next' link of a paginated response.
+        :param url: full URL including API root.
+        :type url: str
+        :param parameters: (optional) parameters for request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :param resource: (optional) resource path used in exception messages. Defaults to url.
+        :type resource: str
+        :param stream: (optional) Returns paginated responses with a generator of results decoded as they arrive.
+        Cached resources are never streamed.
+        :type stream: bool
+        :return: JSON object containing MERMAID API data.
+        :rtype: dict
+        """
+        import requests
+
+        resource = resource or url
+
         # Prepares Request and send from Client class Session.
-        req = requests.Request("GET", url=prep_url, params=parameters)
+        req = requests.Request("GET", url=url, params=parameters)
         prepped = self.session.prepare_request(req)
-        resp = self.session.send(prepped, timeout=10)
+
+        memory_key = None
+        if self.memory_cache is not None and resource in self.memory_cache:
+            memory_key = (prepped.url, self.token)
+            hit, data = self.memory_cache.get(memory_key, resource)
+            if hit:
+                self.metrics.increment("cache_hits_memory", resource)
+                return data
+            stream = False
+
+        try:
+            if self._single_flight is not None and not stream:
+                # Identical concurrent requests wait for the first one and share its response or error.
+                data, shared = self._single_flight.do(
+                    prepped.url, lambda: self._send(prepped, resource)
+                )
+                if shared:
+                    self.metrics.increment("coalesced", resource)
+                    return data
+            else:
+                data = self._send(prepped, resource, stream=stream)
+        except Exception as e:
+            self.metrics.increment("errors", resource)
+            self._run_hooks("on_error", e, resource)
+            raise
+
+        if memory_key:
+            self.memory_cache.set(memory_key, data, resource)
+        return data
+
+    def _send(self, prepped, resource: str, stream: bool = False):
+        """
+        Sends a prepared request from Client Session, going through the ResponseCache when set.
+        :param prepped: prepared request.
+        :type prepped: requests.PreparedRequest
+        :param resource: resource path used for cache policies and exception messages.
+        :type resource: str
+        :param stream: (optional) Returns paginated responses with a generator of results decoded as they arrive.
+        :type stream: bool
+        :return: JSON object containing MERMAID API data.
+        :rtype: dict
+        """
+        import requests
+
+        # Serves fresh cached responses, and revalidates stale ones with a conditional request.
+        policy = self.cache.policy(resource) if self.cache else None
+        cached = None
+        if policy:
+            key = self.cache.key(prepped.url, self.token)
+            cached = self.cache.get(key)
+            stream = False
+            if cached:
+                if policy.ttl is not None and time.time() - cached["stored_at"] < policy.ttl:
+                    self.metrics.increment("cache_hits_disk", resource)
+                    return self._decode(cached["body"], resource)
+                if policy.revalidate and cached["etag"]:
+                    prepped.headers["If-None-Match"] = cached["etag"]
+                if policy.revalidate and cached["last_modified"]:
+                    prepped.headers["If-Modified-Since"] = cached["last_modified"]
+
+        resp = self._send_with_retries(prepped, resource, stream=stream)
 
         # Returns JSON if response code OK.
-        if resp.status_code == requests.codes.ok:
-            return resp.json()
+        if resp.status_code == requests.codes.not_modified and cached:
+            self.cache.touch(key)
+            self.metrics.increment("cache_hits_revalidated", resource)
+            return self._decode(cached["body"], resource)
+        elif resp.status_code == requests.codes.ok:
+            if stream:
+                return StreamedPage(resp.iter_content(chunk_size=64 * 1024)).page()
+            if policy:
+                self.cache.set(
+                    key,
+                    resp.content,
+                    etag=resp.headers.get("ETag"),
+                    last_modified=resp.headers.get("Last-Modified"),
+                )
+            return self._decode(resp.content, resource)
         elif resp.status_code == 401:
             raise UnauthorizedClientException(code=resp.status_code)
         elif resp.status_code == 404:
             raise InvalidResourceException(resource=resource, code=resp.status_code)
         else:
-            raise Exception(
-                f"Exception _fetch_resource. Response Code: {resp.status_code}"
+            raise FatalResponseException(resource=resource, code=resp.status_code)
+
+    def _decode(self, body: bytes, resource: str):
+        start = time.perf_counter()
+        data = loads(body)
+        self.metrics.observe_decode(resource, time.perf_counter() - start)
+        return data
+
+    def _send_with_retries(self, prepped, resource: str, stream: bool = False):
+        """
+        Sends a prepared request, retrying rate limited (429) and transient (5xx) responses, connection errors and
+        timeouts with exponential backoff, honoring Retry-After up to backoff_max.
+        :param prepped: prepared request.
+        :type prepped: requests.PreparedRequest
+        :param resource: resource path used in exception messages.
+        :type resource: str
+        :param stream: (optional) Streams the response body.
+        :type stream: bool
+        :return: response, with a non retryable status code.
+        :rtype: requests.Response
+        """
+        import requests
+
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            if attempt:
+                self.metrics.increment("retries", resource)
+            self._run_hooks("pre_request", prepped, resource)
+
+            start = time.perf_counter()
+            try:
+                with self.metrics.span(resource, prepped.url):
+                    resp = self.session.send(prepped, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise RetryableResponseException(resource=resource, message=str(e)) from e
+                time.sleep(backoff_delay(attempt, self.backoff_factor, self.backoff_max))
+                continue
+            elapsed = time.perf_counter() - start
+
+            # Streamed bodies aren't downloaded yet, their size is taken from the headers.
+            size = resp.headers.get("Content-Length") if stream else len(resp.content)
+            self.metrics.observe_request(
+                resource, elapsed, int(size) if size is not None else None
+            )
+            self._run_hooks("post_response", resp, resource, elapsed)
+
+            if resp.status_code not in RETRY_STATUS_CODES:
+                return resp
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            resp.close()
+            # Retry-After longer than backoff_max is left to the caller, rather than blocking for it.
+            if attempt == self.retries or (retry_after is not None and retry_after > self.backoff_max):
+                if resp.status_code == 429:
+                    raise RateLimitedException(resource=resource, retry_after=retry_after)
+                raise RetryableResponseException(
+                    resource=resource, code=resp.status_code, retry_after=retry_after
+                )
+            if retry_after is None:
+                retry_after = backoff_delay(attempt, self.backoff_factor, self.backoff_max)
+            time.sleep(retry_after)
+
+    # Pagination.
+    def _iter_pages(
+        self,
+        resource: str,
+        parameters=None,
+        max_workers: int = None,
+        start_url: str = None,
+    ):
+        """
+        Lazily fetches each page of a resource, following the 'next' link of paginated responses. Non-paginated
+        responses are yielded as a single page. When max_workers > 1 and the first page gives the record count,
+        the remaining pages are fetched concurrently and yielded in order.
+        :param resource: resource path.
+        :type resource: str
+        :param parameters: (optional) parameters for the first request. Subsequent 'next' links carry their own.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :param max_workers: (optional) Overrides Client max_workers.
+        :type max_workers: int
+        :param start_url: (optional) 'next' link of a page already consumed, fetching starts from it instead of the
+        first page.
+        :type start_url: str
+        :return: generator of JSON pages.
+        :rtype: generator
+        """
+        max_workers = max_workers or self.max_workers
+
+        if start_url:
+            page = self._fetch_url(start_url, resource=resource, stream=self.stream)
+        else:
+            page = self._fetch_resource(resource, parameters=parameters, stream=self.stream)
+        page_size = 0
+        if isinstance(page, dict) and not isinstance(page.get("results"), (list, type(None))):
+            # Streamed results are counted as the consumer reads them, giving the page size once resumed.
+            def counted(results):
+                nonlocal page_size
+                for record in results:
+                    page_size += 1
+                    yield record
+
+            page["results"] = counted(page["results"])
+        elif isinstance(page, dict):
+            page_size = len(page.get("results") or [])
+        self.metrics.increment("pages", resource)
+        yield page
+
+        if not isinstance(page, dict) or not page.get("next"):
+            return
+
+        urls = None
+        if max_workers > 1:
+            urls = page_urls(page["next"], page.get("count"), page_size)
+
+        if urls:
+            for page in ordered_map(
+                lambda url: self._fetch_url(url, resource=resource, stream=self.stream),
+                urls,
+                max_workers=max_workers,
+                max_inflight=self.max_inflight_pages,
+            ):
+                self.metrics.increment("pages", resource)
+                yield page
+            return
+
+        while isinstance(page, dict) and page.get("next"):
+            page = self._fetch_url(page["next"], resource=resource, stream=self.stream)
+            self.metrics.increment("pages", resource)
+            yield page
+
+    def iter_resource(
+        self,
+        resource: str,
+        parameters=None,
+        max_workers: int = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every record of a resource across all pages. Only the pages being fetched are held in memory.
+        :param resource: resource path eg. 'fishspecies', 'projects/<id>/obstransectbeltfishs/'.
+        :type resource: str
+        :param parameters: (optional) parameters for request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :param max_workers: (optional) Overrides Client max_workers.
+        :type max_workers: int
+        :param fields: (optional) Keeps only these fields of each record. With Client(stream=True), each record is
+        projected as soon as it's decoded. Defaults to (fields=None), every field.
+        :type fields: list
+        :return: generator of records.
+        :rtype: generator
+        """
+        for page in self._iter_pages(resource, parameters=parameters, max_workers=max_workers):
+            if isinstance(page, dict) and "results" in page:
+                records = page["results"]
+            elif isinstance(page, list):
+                records = page
+            else:
+                records = [page]
+            if fields:
+                records = (select_fields(record, fields) for record in records)
+            yield from records
+
+    def fetch_all(
+        self,
+        resource: str,
+        parameters=None,
+        max_workers: int = None,
+        fields: list = None,
+    ):
+        """
+        Eagerly fetches every record of a resource across all pages.
+        :param resource: resource path eg. 'fishspecies', 'projects/<id>/obstransectbeltfishs/'.
+        :type resource: str
+        :param parameters: (optional) parameters for request.
+        :type parameters: dict:(../?key=val), str:(../?str).
+        :param max_workers: (optional) Overrides Client max_workers.
+        :type max_workers: int
+        :param fields: (optional) Keeps only these fields of each record. Defaults to (fields=None), every field.
+        :type fields: list
+        :return: all records.
+        :rtype: list
+        """
+        return list(
+            self.iter_resource(
+                resource, parameters=parameters, max_workers=max_workers, fields=fields
             )
+        )
 
     # Get functions.
     def get_info(self, info: str):
@@ -122,19 +712,22 @@ class Client:
         See https://mermaid-api.readthedocs.io/en/latest/nonproject.html for more information on non-project resources.
         :param info: health, version, profiles, projecttags, sites, managements, me.
         :type info: str
-        :return: non-project resource data.
+        :return: non-project resource data. Only the first page of paginated resources, see iter_info.
         :rtype: dict, str
         """
-        # TODO: Handle pagination
-        if info == "me" and not self.authenticated:
-            raise UnauthorizedClientException(
-                message='Authentication required for access to "me" endpoint'
-            )
+        self._validate_info(info)
+        return self._fetch_resource(info)
 
-        if info in self.non_project_resources:
-            return self._fetch_resource(info)
-        else:
-            raise InvalidResourceException(resource=info)
+    def iter_info(self, info: str):
+        """
+        Lazily iterates every record of a non-project resource across all pages.
+        :param info: health, version, profiles, projecttags, sites, managements, me.
+        :type info: str
+        :return: generator of non-project resource records.
+        :rtype: generator
+        """
+        self._validate_info(info)
+        return self.iter_resource(info)
 
     def get_choices(self):
         """
@@ -143,7 +736,6 @@ class Client:
         :return: list of choice objects.
         :rtype: list
         """
-        # TODO: Filter: /updates/?timestamp="DATE"
         return self._fetch_resource("choices")
 
     def get_benthic_attributes(self):
@@ -202,6 +794,15 @@ class Client:
         """
         return self._fetch_resource("fishsizes")
 
+    def get_taxonomy_catalog(self):
+        """
+        Gets indexed lookup tables of fish species, genera, families, groupings and benthic attributes, built from
+        every page of those resources. Lookups by id or name don't scan lists.
+        :return: taxonomy catalog.
+        :rtype: TaxonomyCatalog
+        """
+        return TaxonomyCatalog.from_client(self)
+
     def get_projects(self, showall: bool = False):
         """
         Gets the projects resource. Without query parameters, returns a list of projects of which
@@ -217,6 +818,19 @@ class Client:
             payload = "showall"
         return self._fetch_resource("projects", parameters=payload)
 
+    def iter_projects(self, showall: bool = False):
+        """
+        Lazily iterates every project across all pages of the projects resource.
+        :param showall: (optional) Returns all projects unfiltered by the user’s membership.
+        :type showall: bool
+        :return: generator of projects.
+        :rtype: generator
+        """
+        payload = None
+        if showall:
+            payload = "showall"
+        return self.iter_resource("projects", parameters=payload)
+
     def get_project(self, id: str = None, name: str = None):
         """
         Gets a specific MERMAID project. Either name or id required.
@@ -231,12 +845,32 @@ class Client:
         if id:
             return self.get_project_resource(id=id)
         elif name:
-            projects = self.get_projects(showall=True)
-            project = get_dict_by_keyval("name", name, projects["results"])
-            if project:
-                return project
-            else:
-                raise InvalidProjectException(name=name)
+            return self.lookup_project(name=name)
+
+    # Project index.
+    def _get_project_index(self):
+        """
+        Gets the project index, building it from all pages of projects?showall when missing or older than
+        project_index_ttl.
+        :return: dict of projects by 'name' and by 'id'.
+        :rtype: dict
+        """
+        with self._project_index_lock:
+            if self._project_index_stale():
+                self._set_project_index(self.iter_projects(showall=True))
+            return self._project_index
+
+    def lookup_project(self, id: str = None, name: str = None):
+        """
+        Looks up a project listing in the project index. Either name or id required.
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :return: project from the projects list.
+        :rtype: dict
+        """
+        return self._find_project(self._get_project_index(), id=id, name=name)
 
     def get_project_id(self, name: str):
         """
@@ -246,12 +880,7 @@ class Client:
         :return: project ID.
         :rtype: str
         """
-        project = self.get_project(name=name)
-
-        if project:
-            return project.get("id")
-        else:
-            raise InvalidProjectException(name=name)
+        return self.lookup_project(name=name).get("id")
 
     def get_project_resource(
         self,
@@ -260,6 +889,10 @@ class Client:
         name: str = None,
         filter: str = None,
         filter_val=None,
+        filters: dict = None,
+        fields: list = None,
+        output: str = None,
+        as_frame: bool = False,
     ):
         """
         Gets project resource data including; resources and observations. Authenticated access to project data
@@ -278,11 +911,64 @@ class Client:
         count_min/count_max, length_min/length_max, len_surveyed_min/len_surveyed_max,
         sample_date_before/sample_date_after).
         :type filter_val: str, int
+        :param filters: (optional) mapping of filters to values sent together and applied by the server, eg.
+        {'size_min': 10, 'size_max': 30, 'beltfish__transect__sample_event': '<id>'}. Combined with filter.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each record, eg. ['id', 'size', 'count']. Fields are
+        dropped as records are decoded, or by the API when fields_parameter is set. Defaults to (fields=None).
+        :type fields: list
         For more info visit https://mermaid-api.readthedocs.io/en/latest/projects.html#project-entity-resources
+        :param output: (optional) 'frame' (pandas DataFrame) or 'arrow' (pyarrow Table) built from every page, with
+        nested fields flattened and columns typed per resource. Defaults to (output=None), the first page as JSON.
+        :type output: str
+        :param as_frame: (optional) Shorthand for output='frame'.
+        :type as_frame: bool
         :return: project data.
-        :rtype: dict
+        :rtype: dict, pandas.DataFrame, pyarrow.Table
+        """
+        path = self._project_path(resource=resource, id=id, name=name)
+        payload = build_payload(filter, filter_val, self._request_filters(filters, fields))
+
+        if as_frame:
+            output = "frame"
+        if output:
+            return to_output(
+                self.iter_resource(path, parameters=payload, fields=fields),
+                resource,
+                output,
+            )
+
+        return select_page_fields(
+            self._fetch_resource(resource=path, parameters=payload), fields
+        )
+
+    def iter_project_resource(
+        self,
+        resource: str = None,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val=None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every record of a project resource across all pages. Takes the same arguments as
+        get_project_resource.
+        :return: generator of project resource records.
+        :rtype: generator
+        """
+        path = self._project_path(resource=resource, id=id, name=name)
+        payload = build_payload(filter, filter_val, self._request_filters(filters, fields))
+
+        return self.iter_resource(path, parameters=payload, fields=fields)
+
+    def _project_path(self, resource: str = None, id: str = None, name: str = None):
+        """
+        Generates project resource path favoring id for path creation over name parameter.
+        :return: resource path eg. 'projects/<id>/<resource>/'.
+        :rtype: str
         """
-        # Generate path favoring id for path creation over name parameter.
         path = ""
         if id or name:
             path = "projects/"
@@ -294,14 +980,7 @@ class Client:
             path = f"{path}{p_id}/"
         if resource:
             path = f"{path}{resource}/"
-
-        payload = None
-        if filter:
-            payload = filter
-        if filter and filter_val:
-            payload = {filter: filter_val}
-
-        return self._fetch_resource(resource=path, parameters=payload)
+        return path
 
     def get_observations(
         self,
@@ -310,6 +989,10 @@ class Client:
         name: str = None,
         filter: str = None,
         filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+        output: str = None,
+        as_frame: bool = False,
     ):
         """
         Gets observation resources which are the lowest level of MERMAID data, representing individual observations
@@ -329,51 +1012,59 @@ class Client:
         :param filter_val: (optional) Required for filters requiring values eg. size_min, size_max, count_min,
         count_max, length_min, length_max filters.
         :type filter_val: int
+        :param filters: (optional) mapping of observation filters to values combined in one request, eg.
+        {'size_min': 10, 'size_max': 30, 'beltfish__transect__sample_event': '<id>'}.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each observation, eg. ['fish_attribute', 'size',
+        'count']. See get_project_resource.
+        :type fields: list
+        :param output: (optional) 'frame' (pandas DataFrame) or 'arrow' (pyarrow Table) built from every page, with
+        nested fields flattened and columns typed per resource. Defaults to (output=None), the first page as JSON.
+        :type output: str
+        :param as_frame: (optional) Shorthand for output='frame'.
+        :type as_frame: bool
         :return: observation data.
-        :rtype: dict
+        :rtype: dict, pandas.DataFrame, pyarrow.Table
         """
-        observations_filters = {
-            "obstransectbeltfishs": [
-                "beltfish",
-                "beltfish__transect",
-                "beltfish__transect__sample_event",
-                "fish_attribute",
-                "size_min",
-                "size_max",
-                "count_min",
-                "count_max",
-            ],
-            "obsbenthiclits": [
-                "benthiclit",
-                "benthicpit__transect",
-                "benthiclit__transect__sample_event",
-                "attribute",
-                "growth_form",
-                "length_min",
-                "length_max",
-            ],
-            "obsbenthicpits": [
-                "benthicpit",
-                "benthicpit__transect",
-                "benthicpit__transect__sample_event",
-                "attribute",
-                "growth_form",
-            ],
-            "obshabitatcomplexities": [
-                "habitatcomplexity",
-                "habitatcomplexity__transect",
-                "habitatcomplexity__transect__sample_event",
-                "score",
-            ],
-        }
-
-        if observation not in observations_filters:
-            raise InvalidResourceException(resource=observation)
-        if filter not in observations_filters[observation]:
-            raise InvalidResourceException(resource=filter)
+        self._validate_observation(observation, filter, filters)
 
         return self.get_project_resource(
-            resource=observation, id=id, name=name, filter=filter, filter_val=filter_val
+            resource=observation,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+            output=output,
+            as_frame=as_frame,
+        )
+
+    def iter_observations(
+        self,
+        observation: str,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every observation across all pages. Takes the same arguments as get_observations.
+        :return: generator of observations.
+        :rtype: generator
+        """
+        self._validate_observation(observation, filter, filters)
+
+        return self.iter_project_resource(
+            resource=observation,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
         )
 
     def get_sample_units(
@@ -383,6 +1074,10 @@ class Client:
         name: str = None,
         filter: str = None,
         filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+        output: str = None,
+        as_frame: bool = False,
     ):
         """
         Gets sample units.
@@ -398,18 +1093,57 @@ class Client:
         :type filter: str
         :param filter_val: (optional) Required for filters requiring values, eg.(len_surveyed_min/len_surveyed_max).
         :type filter_val: int
+        :param filters: (optional) mapping of filters to values, eg. {'len_surveyed_min': 10, 'len_surveyed_max': 50}.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each sample unit. See get_project_resource.
+        :type fields: list
+        :param output: (optional) 'frame' (pandas DataFrame) or 'arrow' (pyarrow Table) built from every page, with
+        nested fields flattened and columns typed per resource. Defaults to (output=None), the first page as JSON.
+        :type output: str
+        :param as_frame: (optional) Shorthand for output='frame'.
+        :type as_frame: bool
         :return: Sample units data.
-        :rtype: dict
+        :rtype: dict, pandas.DataFrame, pyarrow.Table
         """
-        unit_filters = ["len_surveyed_min", "len_surveyed_max"]
-
-        if unit not in self.project_sample_units_methods:
-            raise InvalidResourceException(resource=unit)
-        if filter and filter not in unit_filters:
-            raise InvalidResourceException(resource=filter)
+        self._validate_sample_unit(unit, filter, filters)
 
         return self.get_project_resource(
-            resource=unit, id=id, name=name, filter=filter, filter_val=filter_val
+            resource=unit,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+            output=output,
+            as_frame=as_frame,
+        )
+
+    def iter_sample_units(
+        self,
+        unit: str,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every sample unit across all pages. Takes the same arguments as get_sample_units.
+        :return: generator of sample units.
+        :rtype: generator
+        """
+        self._validate_sample_unit(unit, filter, filters)
+
+        return self.iter_project_resource(
+            resource=unit,
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
         )
 
     def get_sample_methods(self, method: str, id: str = None, name: str = None):
@@ -427,17 +1161,30 @@ class Client:
         :return: Sample units methods data.
         :rtype: dict
         """
-        if method not in self.project_sample_units_methods:
-            raise InvalidResourceException(resource=method)
+        self._validate_sample_method(method)
 
         return self.get_project_resource(resource=method, id=id, name=name)
 
+    def iter_sample_methods(self, method: str, id: str = None, name: str = None):
+        """
+        Lazily iterates every sample unit method across all pages. Takes the same arguments as get_sample_methods.
+        :return: generator of sample units methods.
+        :rtype: generator
+        """
+        self._validate_sample_method(method)
+
+        return self.iter_project_resource(resource=method, id=id, name=name)
+
     def get_sample_events(
         self,
         id: str = None,
         name: str = None,
         filter: str = None,
         filter_val: str = None,
+        filters: dict = None,
+        fields: list = None,
+        output: str = None,
+        as_frame: bool = False,
     ):
         """
         Gets sample events. A sample event in MERMAID is a unique combination of site, management regime (both of which
@@ -451,12 +1198,19 @@ class Client:
         :type filter: str
         :param filter_val: (optional) Required for filters requiring values, eg.(len_surveyed_min/len_surveyed_max).
         :type filter_val: str in format (YYYY-MM-DD)
+        :param filters: (optional) mapping of filters to values, eg. a date range {'sample_date_after': '2019-01-01',
+        'sample_date_before': datetime.date(2020, 1, 1)}.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each sample event. See get_project_resource.
+        :type fields: list
+        :param output: (optional) 'frame' (pandas DataFrame) or 'arrow' (pyarrow Table) built from every page, with
+        nested fields flattened and columns typed per resource. Defaults to (output=None), the first page as JSON.
+        :type output: str
+        :param as_frame: (optional) Shorthand for output='frame'.
+        :type as_frame: bool
         :return: sample events data.
         """
-        event_filters = ["sample_date_before", "sample_date_after"]
-
-        if filter and filter not in event_filters:
-            raise InvalidResourceException(resource=filter)
+        self._validate_sample_event(filter, filters)
 
         return self.get_project_resource(
             resource="sampleevents",
@@ -464,4 +1218,645 @@ class Client:
             name=name,
             filter=filter,
             filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+            output=output,
+            as_frame=as_frame,
+        )
+
+    def iter_sample_events(
+        self,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val: str = None,
+        filters: dict = None,
+        fields: list = None,
+    ):
+        """
+        Lazily iterates every sample event across all pages. Takes the same arguments as get_sample_events.
+        :return: generator of sample events.
+        :rtype: generator
+        """
+        self._validate_sample_event(filter, filters)
+
+        return self.iter_project_resource(
+            resource="sampleevents",
+            id=id,
+            name=name,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
         )
+
+    # Bulk functions.
+    def _bulk_workers(self, tasks: int, max_workers: int = None):
+        # Worker threads of a bulk fetch: max_workers, else one per task up to the greater of Client max_workers and
+        # bulk_max_workers.
+        if max_workers:
+            return max_workers
+        return max(min(tasks, max(self.max_workers, self.bulk_max_workers)), 1)
+
+    def _iter_bulk(
+        self,
+        resource: str,
+        project_ids: list,
+        filter: str = None,
+        filter_val=None,
+        filters: dict = None,
+        fields: list = None,
+        max_workers: int = None,
+    ):
+        """
+        Fetches a project resource for many projects concurrently, one project per worker thread.
+        :param resource: project resource.
+        :type resource: str
+        :param project_ids: MERMAID project IDs.
+        :type project_ids: list
+        :param filter: (optional) MERMAID project resource filter.
+        :type filter: str
+        :param filter_val: (optional) Required for filters requiring values.
+        :param filters: (optional) mapping of filters to values.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each record.
+        :type fields: list
+        :param max_workers: (optional) Number of projects fetched at once. Defaults to one per project, up to the
+        greater of Client max_workers and bulk_max_workers.
+        :type max_workers: int
+        :return: generator of copies of the records, each tagged with its 'project_id', in project_ids order.
+        :rtype: generator
+        """
+        project_ids = list(project_ids)
+        payload = build_payload(filter, filter_val, self._request_filters(filters, fields))
+
+        def fetch_project(p_id):
+            path = self._project_path(resource=resource, id=p_id)
+            # Pages are fetched serially inside each project, the pool is spread across projects.
+            records = self.fetch_all(path, parameters=payload, max_workers=1, fields=fields)
+            return [dict(record, project_id=p_id) for record in records]
+
+        for records in ordered_map(
+            fetch_project,
+            project_ids,
+            max_workers=self._bulk_workers(len(project_ids), max_workers),
+            max_inflight=self.max_inflight_pages,
+        ):
+            yield from records
+
+    def get_observations_bulk(
+        self,
+        observation: str,
+        project_ids: list,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+        max_workers: int = None,
+    ):
+        """
+        Gets observations for many projects concurrently as one combined stream. Projects are fetched at once on up to
+        bulk_max_workers threads, or max_workers per call.
+        :param observation: Project observations include; obstransectbeltfishs, obsbenthiclits, obsbenthicpits,
+        obshabitatcomplexities, obscoloniesbleached, obsquadratbenthicpercent.
+        :type observation: str
+        :param project_ids: MERMAID project IDs.
+        :type project_ids: list
+        :param filter: See get_observations.
+        :type filter: str
+        :param filter_val: (optional) Required for filters requiring values.
+        :type filter_val: int
+        :param filters: (optional) mapping of filters to values, see get_observations.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each observation.
+        :type fields: list
+        :param max_workers: (optional) Number of projects fetched at once. Defaults to one per project, up to
+        bulk_max_workers.
+        :type max_workers: int
+        :return: generator of observations, each tagged with its 'project_id'.
+        :rtype: generator
+        """
+        self._validate_observation(observation, filter, filters)
+
+        return self._iter_bulk(
+            observation,
+            project_ids,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+            max_workers=max_workers,
+        )
+
+    def get_sample_units_bulk(
+        self,
+        unit: str,
+        project_ids: list,
+        filter: str = None,
+        filter_val: int = None,
+        filters: dict = None,
+        fields: list = None,
+        max_workers: int = None,
+    ):
+        """
+        Gets sample units for many projects concurrently as one combined stream.
+        :param unit: Sample units name. Sample units: fishbelttransects, benthictransects, quadratcollections.
+        :type unit: str
+        :param project_ids: MERMAID project IDs.
+        :type project_ids: list
+        :param filter: len_surveyed_min, len_surveyed_max.
+        :type filter: str
+        :param filter_val: (optional) Required for filters requiring values.
+        :type filter_val: int
+        :param filters: (optional) mapping of filters to values, see get_sample_units.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each sample unit.
+        :type fields: list
+        :param max_workers: (optional) Number of projects fetched at once. Defaults to one per project, up to
+        bulk_max_workers.
+        :type max_workers: int
+        :return: generator of sample units, each tagged with its 'project_id'.
+        :rtype: generator
+        """
+        self._validate_sample_unit(unit, filter, filters)
+
+        return self._iter_bulk(
+            unit,
+            project_ids,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+            max_workers=max_workers,
+        )
+
+    def get_sample_events_bulk(
+        self,
+        project_ids: list,
+        filter: str = None,
+        filter_val: str = None,
+        filters: dict = None,
+        fields: list = None,
+        max_workers: int = None,
+    ):
+        """
+        Gets sample events for many projects concurrently as one combined stream.
+        :param project_ids: MERMAID project IDs.
+        :type project_ids: list
+        :param filter: sample_date_before, sample_date_after
+        :type filter: str
+        :param filter_val: (optional) Required for filters requiring values.
+        :type filter_val: str in format (YYYY-MM-DD)
+        :param filters: (optional) mapping of filters to values, see get_sample_events.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each sample event.
+        :type fields: list
+        :param max_workers: (optional) Number of projects fetched at once. Defaults to one per project, up to
+        bulk_max_workers.
+        :type max_workers: int
+        :return: generator of sample events, each tagged with its 'project_id'.
+        :rtype: generator
+        """
+        self._validate_sample_event(filter, filters)
+
+        return self._iter_bulk(
+            "sampleevents",
+            project_ids,
+            filter=filter,
+            filter_val=filter_val,
+            filters=filters,
+            fields=fields,
+            max_workers=max_workers,
+        )
+
+    # Join functions.
+    def iter_joined_observations(
+        self,
+        observation: str,
+        id: str = None,
+        name: str = None,
+        filters: dict = None,
+        fields: list = None,
+        relations: tuple = None,
+    ):
+        """
+        Lazily iterates every observation of a project joined to its sample unit method, sample unit, sample event,
+        site and management, eg. 'sample_event__sample_date', 'site__name'. The related resources are fetched once and
+        indexed, see ProjectJoin, observations are streamed.
+        :param observation: observation resource eg. obstransectbeltfishs, obshabitatcomplexities.
+        :type observation: str
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :param filters: (optional) mapping of observation filters to values, see get_observations.
+        :type filters: dict
+        :param fields: (optional) Keeps only these observation fields. Must include the method field, eg. 'beltfish'.
+        :type fields: list
+        :param relations: (optional) related records to add. Defaults to method, sample_unit, sample_event, site and
+        management.
+        :type relations: tuple
+        :return: generator of denormalized observations.
+        :rtype: generator
+        """
+        if observation not in OBSERVATION_RELATIONS:
+            raise InvalidResourceException(resource=observation)
+        p_id = id or self.get_project_id(name=name)
+        observations = self.iter_observations(
+            observation, id=p_id, filters=filters, fields=fields
+        )
+        join = ProjectJoin.from_client(self, observation, id=p_id)
+
+        if relations is None:
+            return join.denormalize(observations)
+        return join.denormalize(observations, relations=relations)
+
+    # Aggregation functions.
+    def aggregate_observations(
+        self,
+        observation: str,
+        id: str = None,
+        name: str = None,
+        catalog: TaxonomyCatalog = None,
+        filters: dict = None,
+    ):
+        """
+        Aggregates a project's observations as their pages arrive: fish biomass for obstransectbeltfishs, benthic
+        category percent cover for obsbenthicpits and obsbenthiclits, and mean quadrat percent cover for
+        obsquadratbenthicpercent. Sample unit methods, sample units and sample events are fetched to roll the results
+        up, see Aggregator.rollup.
+        :param observation: obstransectbeltfishs, obsbenthicpits, obsbenthiclits or obsquadratbenthicpercent.
+        :type observation: str
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :param catalog: (optional) taxonomy catalog, reused across projects. Defaults to get_taxonomy_catalog().
+        :type catalog: TaxonomyCatalog
+        :param filters: (optional) mapping of observation filters to values, see get_observations. Only sample units
+        having filtered observations are rolled up.
+        :type filters: dict
+        :return: aggregator holding the totals per sample unit.
+        :rtype: Aggregator
+        """
+        if observation not in OBSERVATION_METHODS:
+            raise InvalidResourceException(resource=observation)
+        p_id = id or self.get_project_id(name=name)
+        _, methods, units, unit_key = OBSERVATION_METHODS[observation]
+        observations = self.iter_observations(observation, id=p_id, filters=filters)
+
+        sample_units = sample_unit_index(
+            self.iter_project_resource(methods, id=p_id),
+            self.iter_project_resource(units, id=p_id),
+            self.iter_sample_events(id=p_id),
+            unit_key=unit_key,
+            project=p_id,
+        )
+        if observation == "obsquadratbenthicpercent":
+            aggregator = QuadratCover(sample_units)
+        elif observation == "obstransectbeltfishs":
+            aggregator = FishBiomass(
+                catalog or self.get_taxonomy_catalog(),
+                sample_units,
+                widths=self._belt_widths(),
+            )
+        else:
+            aggregator = BenthicCover(
+                catalog or self.get_taxonomy_catalog(), sample_units, observation
+            )
+
+        # Sample units the filters excluded aren't rolled up as empty ones.
+        aggregator.observed_only = bool(filters)
+        return aggregator.add(observations)
+
+    def _belt_widths(self):
+        """
+        Gets belt transect widths from the choices resource.
+        :return: width in metres, or width conditions by size, by width id.
+        :rtype: dict
+        """
+        for choice in self.get_choices() or []:
+            if choice.get("name") == "belttransectwidths":
+                return {
+                    width.get("id"): width.get("conditions") or width.get("val")
+                    for width in choice.get("data") or []
+                }
+        return {}
+
+    # Snapshot functions.
+    def snapshot_project(
+        self,
+        id: str = None,
+        name: str = None,
+        resources: list = None,
+        root: str = None,
+        format: str = "parquet",
+        batch_size: int = 10000,
+        progress=None,
+        max_workers: int = None,
+    ):
+        """
+        Downloads a whole project in one job: the project, every project resource, observation, sample unit and
+        method resource, and sampleevents. The project id is resolved once, the plan is deduplicated and resources are
+        fetched concurrently. Resources the client isn't authorized to read are listed under
+        'unavailable' instead of failing the snapshot.
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :param resources: (optional) project resources. Defaults to project_resources, project_observations,
+        project_sample_units_methods and sampleevents.
+        :type resources: list
+        :param root: (optional) snapshot root directory. Records are streamed into a columnar snapshot, see
+        export_resource, and a 'snapshot.json' manifest is written to the project partition once every resource is
+        written. Defaults to (root=None), records are kept in memory.
+        :type root: str
+        :param format: (optional) parquet or arrow, when root is given. Defaults to (format='parquet').
+        :type format: str
+        :param batch_size: (optional) Number of records per file, when root is given. Defaults to (batch_size=10000).
+        :type batch_size: int
+        :param progress: (optional) callback called with (resource, completed, total) as each resource completes.
+        :type progress: callable
+        :param max_workers: (optional) Number of resources fetched at once. Defaults to one per resource, up to the
+        greater of Client max_workers and bulk_max_workers.
+        :type max_workers: int
+        :return: snapshot with 'project', 'taken_at', 'counts', 'unavailable' and either 'resources' (records per
+        resource) or 'files' (file paths per resource).
+        :rtype: dict
+        """
+        p_id = id or self.get_project_id(name=name)
+        # Keeps the first occurrence of resources listed more than once.
+        plan = list(
+            dict.fromkeys(
+                resources
+                or self.project_resources
+                + self.project_observations
+                + self.project_sample_units_methods
+                + ["sampleevents"]
+            )
+        )
+        taken_at = datetime.now(timezone.utc).isoformat()
+        completed = [0]
+        lock = threading.Lock()
+
+        def fetch(resource):
+            path = self._project_path(resource=resource, id=p_id)
+            # Pages are fetched serially inside each resource, the pool is spread across resources.
+            records = self.iter_resource(path, max_workers=1)
+            try:
+                if root:
+                    count = [0]
+
+                    def counted(records):
+                        for record in records:
+                            count[0] += 1
+                            yield record
+
+                    result = write_dataset(
+                        counted(records),
+                        root,
+                        p_id,
+                        resource,
+                        format=format,
+                        batch_size=batch_size,
+                    )
+                    count = count[0]
+                else:
+                    result = list(records)
+                    count = len(result)
+            except UnauthorizedClientException:
+                result, count = None, None
+
+            with lock:
+                completed[0] += 1
+                if progress:
+                    progress(resource, completed[0], len(plan))
+            return resource, result, count
+
+        snapshot = {
+            "project": self.get_project_resource(id=p_id),
+            "taken_at": taken_at,
+            "counts": {},
+            "unavailable": [],
+            "files" if root else "resources": {},
+        }
+        for resource, result, count in ordered_map(
+            fetch,
+            plan,
+            max_workers=self._bulk_workers(len(plan), max_workers),
+            max_inflight=len(plan),
+        ):
+            if count is None:
+                snapshot["unavailable"].append(resource)
+                continue
+            snapshot["counts"][resource] = count
+            snapshot["files" if root else "resources"][resource] = result
+
+        if root:
+            directory = os.path.join(root, f"project={p_id}")
+            os.makedirs(directory, exist_ok=True)
+            manifest = os.path.join(directory, "snapshot.json")
+            # Written last and atomically, a manifest marks a complete snapshot.
+            with open(f"{manifest}.tmp", "w") as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(f"{manifest}.tmp", manifest)
+
+        return snapshot
+
+    # Export functions.
+    def export_resource(
+        self,
+        resource: str,
+        root: str,
+        id: str = None,
+        name: str = None,
+        filter: str = None,
+        filter_val=None,
+        filters: dict = None,
+        fields: list = None,
+        format: str = "parquet",
+        batch_size: int = 10000,
+        resume: bool = False,
+    ):
+        """
+        Streams every record of a project resource into a columnar snapshot on disk, partitioned by project and
+        resource, eg. '<root>/project=<id>/resource=obstransectbeltfishs/part-00000.parquet'. Open it with
+        columnar.read_dataset. Requires pyarrow.
+        Part files are written atomically at page boundaries once about batch_size records are buffered, each followed
+        by a checkpoint in the partition recording the export and the 'next' link of the last written page. With
+        resume=True, an export that failed partway continues from its checkpoint, dropping anything written after it,
+        and a completed export returns its files without fetching. Loop over projects with resume=True to resume
+        exports spanning many projects.
+        :param resource: project resource eg. 'obstransectbeltfishs', 'sampleevents'.
+        :type resource: str
+        :param root: snapshot root directory.
+        :type root: str
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :param filter: (optional) MERMAID project resource filter.
+        :type filter: str
+        :param filter_val: (optional) Required for filters requiring values.
+        :param filters: (optional) mapping of filters to values.
+        :type filters: dict
+        :param fields: (optional) Keeps only these fields of each record, ie. columns of the snapshot.
+        :type fields: list
+        :param format: (optional) parquet or arrow (Arrow IPC). Defaults to (format='parquet').
+        :type format: str
+        :param batch_size: (optional) Number of records per file, rounded up to whole pages. Defaults to
+        (batch_size=10000).
+        :type batch_size: int
+        :param resume: (optional) Continues from the checkpoint of an earlier export of the same resource, filter and
+        format. Defaults to (resume=False), the partition is exported from scratch.
+        :type resume: bool
+        :return: written file paths.
+        :rtype: list
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Invalid format: {format}")
+        p_id = id or self.get_project_id(name=name)
+        path = self._project_path(resource=resource, id=p_id)
+        payload = build_payload(filter, filter_val, self._request_filters(filters, fields))
+        directory = partition_path(root, p_id, resource)
+        os.makedirs(directory, exist_ok=True)
+
+        job = {
+            "project": p_id,
+            "resource": resource,
+            "parameters": payload,
+            "fields": fields,
+            "format": format,
+        }
+        checkpoint = read_checkpoint(directory) if resume else None
+        if checkpoint is None or checkpoint.get("job") != job:
+            checkpoint = {"job": job, "next": None, "records": 0, "parts": [], "complete": False}
+            remove_parts(directory)
+            write_checkpoint(directory, checkpoint)
+        else:
+            # Parts written after the checkpoint are fetched and written again.
+            remove_parts(
+                directory,
+                keep=[os.path.join(directory, part) for part in checkpoint["parts"]],
+            )
+        if checkpoint["complete"]:
+            return [os.path.join(directory, part) for part in checkpoint["parts"]]
+
+        def flush(records, next_url):
+            part = write_part(records, directory, len(checkpoint["parts"]), format=format)
+            checkpoint["parts"].append(os.path.basename(part))
+            checkpoint["records"] += len(records)
+            checkpoint["next"] = next_url
+            write_checkpoint(directory, checkpoint)
+
+        buffer = []
+        for page in self._iter_pages(path, parameters=payload, start_url=checkpoint["next"]):
+            next_url = None
+            if isinstance(page, dict) and "results" in page:
+                records = page["results"]
+                next_url = page.get("next")
+            elif isinstance(page, list):
+                records = page
+            else:
+                records = [page]
+            if fields:
+                records = (select_fields(record, fields) for record in records)
+            buffer.extend(records)
+            if len(buffer) >= batch_size and next_url:
+                flush(buffer, next_url)
+                buffer = []
+
+        if buffer:
+            flush(buffer, None)
+        checkpoint["complete"] = True
+        write_checkpoint(directory, checkpoint)
+
+        return [os.path.join(directory, part) for part in checkpoint["parts"]]
+
+    # Sync functions.
+    def sync_project_resource(
+        self,
+        resource: str,
+        store,
+        id: str = None,
+        name: str = None,
+        overlap: float = 300,
+    ):
+        """
+        Syncs a project resource into a local SyncStore. The first sync downloads every record, later syncs fetch only
+        records added, modified or removed since the stored watermark through the resource's updates endpoint.
+        The watermark is taken from the local clock less an overlap, so changes are still fetched when the local
+        clock runs ahead of the server's. Changes fetched again are merged by id.
+        See https://mermaid-api.readthedocs.io/en/latest/projects.html for more information on project resources.
+        :param resource: project resource eg. 'obstransectbeltfishs', 'sampleevents'.
+        :type resource: str
+        :param store: local store of synced records.
+        :type store: SyncStore
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :param overlap: (optional) Seconds the watermark is moved back, the largest expected clock difference with
+        the server. Defaults to (overlap=300).
+        :type overlap: float
+        :return: number of records added, modified and removed.
+        :rtype: dict
+        """
+        p_id = id or self.get_project_id(name=name)
+        path = self._project_path(resource=resource, id=p_id)
+        # Watermark is taken before fetching so changes made during the sync are picked up next time.
+        timestamp = (datetime.now(timezone.utc) - timedelta(seconds=overlap)).isoformat()
+        watermark = store.watermark(p_id, resource)
+
+        if watermark is None:
+            added = store.replace(p_id, resource, self.iter_resource(path), timestamp)
+            return {"added": added, "modified": 0, "removed": 0}
+
+        updates = self._fetch_resource(
+            f"{path}updates/", parameters={"timestamp": watermark}
+        )
+        removed = [
+            record.get("id") if isinstance(record, dict) else record
+            for record in updates.get("removed") or []
+        ]
+        # Each record is counted once, under its latest change.
+        modified = unique_by_id(updates.get("modified") or [], exclude=removed)
+        added = unique_by_id(
+            updates.get("added") or [],
+            exclude=[*removed, *(record.get("id") for record in modified)],
+        )
+        store.apply(p_id, resource, added, modified, removed, timestamp=timestamp)
+
+        return {"added": len(added), "modified": len(modified), "removed": len(removed)}
+
+    def sync_project(
+        self,
+        store,
+        id: str = None,
+        name: str = None,
+        resources: list = None,
+        overlap: float = 300,
+    ):
+        """
+        Syncs project resources into a local SyncStore. See sync_project_resource.
+        :param store: local store of synced records.
+        :type store: SyncStore
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :param resources: (optional) project resources. Defaults to every observation resource and sampleevents.
+        :type resources: list
+        :param overlap: (optional) Seconds the watermark is moved back, see sync_project_resource. Defaults to
+        (overlap=300).
+        :type overlap: float
+        :return: number of records added, modified and removed per resource.
+        :rtype: dict
+        """
+        p_id = id or self.get_project_id(name=name)
+        resources = resources or self.project_observations + ["sampleevents"]
+
+        return {
+            resource: self.sync_project_resource(resource, store, id=p_id, overlap=overlap)
+            for resource in resources
+        }
@@ -0,0 +1,217 @@
+import glob
+import json
+import os
+
+from .utilities import batched
+
+# File extension per columnar format.
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+# Export checkpoint file name in a partition directory.
+CHECKPOINT = "_checkpoint.json"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required for columnar snapshots, install with: pip install mermaid-py[arrow]"
+        )
+    return pyarrow
+
+
+def partition_path(root: str, project: str, resource: str):
+    """
+    Gets the directory of a project resource partition, eg. '<root>/project=<id>/resource=sampleevents'.
+    :param root: snapshot root directory.
+    :type root: str
+    :param project: MERMAID project ID.
+    :type project: str
+    :param resource: project resource.
+    :type resource: str
+    :return: partition directory.
+    :rtype: str
+    """
+    return os.path.join(root, f"project={project}", f"resource={resource}")
+
+
+def write_dataset(
+    records,
+    root: str,
+    project: str,
+    resource: str,
+    format: str = "parquet",
+    batch_size: int = 10000,
+):
+    """
+    Streams records into a partition of a columnar snapshot, one file per batch, replacing previous files of the
+    partition. At most batch_size records are held in memory.
+    :param records: iterable of records eg. Client.iter_observations(...).
+    :param root: snapshot root directory.
+    :type root: str
+    :param project: MERMAID project ID.
+    :type project: str
+    :param resource: project resource.
+    :type resource: str
+    :param format: (optional) parquet or arrow (Arrow IPC, memory-mappable). Defaults to (format='parquet').
+    :type format: str
+    :param batch_size: (optional) Number of records per file. Defaults to (batch_size=10000).
+    :type batch_size: int
+    :return: written file paths.
+    :rtype: list
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Invalid format: {format}")
+    _import_pyarrow()
+
+    directory = partition_path(root, project, resource)
+    os.makedirs(directory, exist_ok=True)
+    remove_parts(directory)
+    # A rewritten partition invalidates the checkpoint of an earlier resumable export.
+    if os.path.exists(os.path.join(directory, CHECKPOINT)):
+        os.remove(os.path.join(directory, CHECKPOINT))
+
+    paths = []
+    for n, batch in enumerate(batched(records, batch_size)):
+        paths.append(write_part(batch, directory, n, format=format))
+    return paths
+
+
+def part_path(directory: str, n: int, format: str = "parquet"):
+    """
+    Gets the path of the nth part file of a partition, eg. '<directory>/part-00003.parquet'.
+    :param directory: partition directory.
+    :type directory: str
+    :param n: part number.
+    :type n: int
+    :param format: (optional) parquet or arrow. Defaults to (format='parquet').
+    :type format: str
+    :return: part file path.
+    :rtype: str
+    """
+    return os.path.join(directory, f"part-{n:05d}.{FORMATS[format]}")
+
+
+def write_part(records: list, directory: str, n: int, format: str = "parquet"):
+    """
+    Writes records to the nth part file of a partition. The file is written under a temporary name and renamed, so
+    a part file is either complete or absent, and rewriting a part replaces it.
+    :param records: list of records.
+    :type records: list
+    :param directory: partition directory.
+    :type directory: str
+    :param n: part number.
+    :type n: int
+    :param format: (optional) parquet or arrow. Defaults to (format='parquet').
+    :type format: str
+    :return: part file path.
+    :rtype: str
+    """
+    pa = _import_pyarrow()
+    table = pa.Table.from_pylist(records)
+    path = part_path(directory, n, format=format)
+    tmp = f"{path}.tmp"
+
+    if format == "parquet":
+        import pyarrow.parquet
+
+        pyarrow.parquet.write_table(table, tmp)
+    else:
+        with pa.ipc.new_file(tmp, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+    return path
+
+
+def remove_parts(directory: str, keep: list = ()):
+    """
+    Removes the part files of a partition, including partially written ones.
+    :param directory: partition directory.
+    :type directory: str
+    :param keep: (optional) part file paths to keep.
+    :type keep: list
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    for stale in glob.glob(os.path.join(directory, "part-*")):
+        if os.path.abspath(stale) not in keep:
+            os.remove(stale)
+
+
+def read_checkpoint(directory: str):
+    """
+    Reads the export checkpoint of a partition.
+    :param directory: partition directory.
+    :type directory: str
+    :return: checkpoint, None when missing.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(directory, CHECKPOINT)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(directory: str, checkpoint: dict):
+    """
+    Atomically replaces the export checkpoint of a partition.
+    :param directory: partition directory.
+    :type directory: str
+    :param checkpoint: JSON serializable checkpoint.
+    :type checkpoint: dict
+    """
+    path = os.path.join(directory, CHECKPOINT)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+
+def read_dataset(
+    root: str, project: str = None, resource: str = None, format: str = "parquet"
+):
+    """
+    Opens a columnar snapshot as a lazily read pyarrow Dataset. Columns and rows are only read when requested, eg.
+    dataset.to_table(columns=['size', 'count']), so projections and filters are pushed down to the files. Part files
+    whose inferred schemas differ, eg. a column that is null in one batch or integral in one batch and fractional in
+    another, are unified, promoting types where needed.
+    :param root: snapshot root directory.
+    :type root: str
+    :param project: (optional) MERMAID project ID, restricts to one project.
+    :type project: str
+    :param resource: (optional) project resource, restricts to one resource.
+    :type resource: str
+    :param format: (optional) parquet or arrow. Defaults to (format='parquet').
+    :type format: str
+    :return: dataset with 'project' and 'resource' partition columns.
+    :rtype: pyarrow.dataset.Dataset
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Invalid format: {format}")
+    pa = _import_pyarrow()
+    import pyarrow.dataset
+
+    pattern = partition_path(root, project or "*", resource or "*")
+    paths = sorted(glob.glob(os.path.join(pattern, f"part-*.{FORMATS[format]}")))
+    if not paths:
+        raise FileNotFoundError(f"No {format} files in: {pattern}")
+
+    file_format = "ipc" if format == "arrow" else format
+    partition_schema = pa.schema([("project", pa.string()), ("resource", pa.string())])
+    partitioning = pyarrow.dataset.partitioning(partition_schema, flavor="hive")
+
+    # Reads only file footers to unify the schemas inferred per batch.
+    files = pyarrow.dataset.dataset(paths, format=file_format)
+    schema = pa.unify_schemas(
+        [fragment.physical_schema for fragment in files.get_fragments()]
+        + [partition_schema],
+        promote_options="permissive",
+    )
+    return pyarrow.dataset.dataset(
+        paths,
+        schema=schema,
+        format=file_format,
+        partitioning=partitioning,
+        partition_base_dir=root,
+    )
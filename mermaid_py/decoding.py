@@ -0,0 +1,119 @@
+import codecs
+import json
+
+# orjson module, imported on first decode, False when not installed.
+_orjson = None
+
+# Whitespace and separators between items of a JSON array.
+_SEPARATORS = " \t\n\r,"
+
+
+def loads(data):
+    """
+    Decodes a JSON document, with orjson when installed.
+    :param data: JSON document.
+    :type data: bytes, str
+    :return: decoded JSON.
+    """
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson as _orjson
+        except ImportError:
+            _orjson = False
+    if _orjson:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+class StreamedPage:
+    """
+    Incrementally decodes a paginated MERMAID API response, eg. {"count": 1, "next": null, "previous": null,
+    "results": [...]}, from a stream of chunks. Metadata before "results" is decoded up front and each result is
+    decoded as it arrives, so the full body and object tree are never held in memory. Responses without "results" are
+    decoded whole.
+    """
+
+    def __init__(self, chunks):
+        """
+        :param chunks: iterable of bytes, eg. requests Response.iter_content(...).
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        # Metadata of paginated responses, body of other responses.
+        self.meta = None
+        self.body = None
+
+        self._read_meta()
+
+    def _read(self):
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        # Drops consumed text before appending, so the buffer stays around one chunk long.
+        self._buffer = self._buffer[self._pos :] + self._decoder.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _read_meta(self):
+        while True:
+            start = self._buffer.find('"results"')
+            if start >= 0:
+                bracket = self._buffer.find("[", start)
+                if bracket >= 0:
+                    prefix = self._buffer[:start].rstrip().rstrip(",")
+                    try:
+                        self.meta = json.loads(f"{prefix}}}")
+                        self._pos = bracket + 1
+                        return
+                    except ValueError:
+                        # "results" isn't the top level key, decodes the whole body instead.
+                        break
+            if not self._read():
+                break
+
+        while self._read():
+            pass
+        self.body = loads(self._buffer)
+
+    def results(self):
+        """
+        Lazily decodes the results of a paginated response.
+        :return: generator of results.
+        :rtype: generator
+        """
+        if self.meta is None:
+            return
+
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _SEPARATORS:
+                self._pos += 1
+            if self._pos >= len(self._buffer):
+                if not self._read():
+                    raise ValueError("Unterminated results in JSON response")
+                continue
+            if self._buffer[self._pos] == "]":
+                return
+
+            try:
+                item, end = self._json.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # Item continues in the next chunk.
+                if not self._read():
+                    raise
+                continue
+            self._pos = end
+            yield item
+
+    def page(self):
+        """
+        Gets the response as a page dict, whose "results" is a generator for paginated responses.
+        :return: page.
+        :rtype: dict
+        """
+        if self.meta is None:
+            return self.body
+        return dict(self.meta, results=self.results())
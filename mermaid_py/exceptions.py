@@ -32,3 +32,42 @@ class InvalidProjectException(Exception):
         elif name:
             self.message = f"{self.message} -- name: {name}"
         super().__init__(self.message)
+
+
+class RetryableResponseException(Exception):
+    def __init__(
+        self,
+        resource: str = None,
+        code: int = None,
+        retry_after: float = None,
+        message: str = None,
+    ):
+        self.code = code
+        self.retry_after = retry_after
+        self.message = f"Transient Error -- Retries Exhausted: {resource}"
+        if code:
+            self.message = f"Response Code: {code}. {self.message}"
+        if message:
+            self.message = message
+        super().__init__(self.message)
+
+
+class RateLimitedException(RetryableResponseException):
+    def __init__(self, resource: str = None, retry_after: float = None):
+        super().__init__(
+            resource=resource,
+            code=429,
+            retry_after=retry_after,
+            message=f"Response Code: 429. Rate Limited: {resource}",
+        )
+
+
+class FatalResponseException(Exception):
+    def __init__(self, resource: str = None, code: int = None, message: str = None):
+        self.code = code
+        self.message = f"Request Failed: {resource}"
+        if code:
+            self.message = f"Response Code: {code}. {self.message}"
+        if message:
+            self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,161 @@
+from .exceptions import InvalidResourceException
+
+# Sample unit and sample unit method filters.
+_SAMPLE_UNIT_FILTERS = ("len_surveyed_min", "len_surveyed_max")
+
+# Supported query filters of every MERMAID API resource, see
+# https://mermaid-api.readthedocs.io/en/latest/projects.html#project-entity-resources
+FILTERS = {
+    # Non-project resources.
+    "health": (),
+    "managements": (),
+    "me": (),
+    "profiles": (),
+    "projecttags": (),
+    "sites": (),
+    "summarysites": (),
+    "version": (),
+    # Project attributes.
+    "benthicattributes": (),
+    "fishfamilies": (),
+    "fishgenera": (),
+    "fishgroupings": (),
+    "fishsizes": (),
+    "fishspecies": (),
+    # Project resources.
+    "collectrecords": (),
+    "observers": (),
+    "project_profiles": (),
+    "sampleevents": ("sample_date_before", "sample_date_after"),
+    # Observations.
+    "obstransectbeltfishs": (
+        "beltfish",
+        "beltfish__transect",
+        "beltfish__transect__sample_event",
+        "fish_attribute",
+        "size_min",
+        "size_max",
+        "count_min",
+        "count_max",
+    ),
+    "obsbenthiclits": (
+        "benthiclit",
+        "benthiclit__transect",
+        "benthiclit__transect__sample_event",
+        "attribute",
+        "growth_form",
+        "length_min",
+        "length_max",
+    ),
+    "obsbenthicpits": (
+        "benthicpit",
+        "benthicpit__transect",
+        "benthicpit__transect__sample_event",
+        "attribute",
+        "growth_form",
+    ),
+    "obshabitatcomplexities": (
+        "habitatcomplexity",
+        "habitatcomplexity__transect",
+        "habitatcomplexity__transect__sample_event",
+        "score",
+    ),
+    "obscoloniesbleached": (
+        "bleachingquadratcollection",
+        "bleachingquadratcollection__quadrat",
+        "bleachingquadratcollection__quadrat__sample_event",
+        "attribute",
+        "growth_form",
+    ),
+    "obsquadratbenthicpercent": (
+        "bleachingquadratcollection",
+        "bleachingquadratcollection__quadrat",
+        "bleachingquadratcollection__quadrat__sample_event",
+        "quadrat_number",
+    ),
+    # Sample units and sample unit methods.
+    "benthiclittransectmethods": _SAMPLE_UNIT_FILTERS,
+    "benthicpittransectmethods": _SAMPLE_UNIT_FILTERS,
+    "benthictransects": _SAMPLE_UNIT_FILTERS,
+    "beltfishtransectmethods": _SAMPLE_UNIT_FILTERS,
+    "bleachingquadratcollectionmethods": _SAMPLE_UNIT_FILTERS,
+    "fishbelttransects": _SAMPLE_UNIT_FILTERS,
+    "habitatcomplexitytransectmethods": _SAMPLE_UNIT_FILTERS,
+    "quadratcollections": _SAMPLE_UNIT_FILTERS,
+    "sampleunitmethods": _SAMPLE_UNIT_FILTERS,
+}
+
+# Query parameters of OpenAPI operations that aren't filters.
+_NON_FILTER_PARAMETERS = frozenset(["format", "limit", "offset", "ordering", "page", "search"])
+
+
+class FilterRegistry:
+    """
+    Supported filters of each MERMAID API resource as frozensets, built once and shared by every client, so
+    validating a resource or filter is a set lookup.
+    """
+
+    def __init__(self, filters: dict = None):
+        """
+        :param filters: (optional) filter names by resource. Defaults to FILTERS.
+        :type filters: dict
+        """
+        self._filters = {
+            resource: frozenset(names) for resource, names in (filters or FILTERS).items()
+        }
+
+    def __contains__(self, resource: str):
+        return resource in self._filters
+
+    def filters(self, resource: str):
+        """
+        Gets the supported filters of a resource.
+        :param resource: resource name eg. 'obstransectbeltfishs'.
+        :type resource: str
+        :return: filter names, empty for unknown resources.
+        :rtype: frozenset
+        """
+        return self._filters.get(resource, frozenset())
+
+    def validate(self, resource: str, filters=()):
+        """
+        Validates a resource and filter names.
+        :param resource: resource name eg. 'obstransectbeltfishs'.
+        :type resource: str
+        :param filters: (optional) filter names.
+        :raises InvalidResourceException: unknown resource or unsupported filter.
+        """
+        supported = self._filters.get(resource)
+        if supported is None:
+            raise InvalidResourceException(resource=resource)
+        for name in filters:
+            if name not in supported:
+                raise InvalidResourceException(resource=name)
+
+    @classmethod
+    def from_openapi(cls, schema: dict, filters: dict = None):
+        """
+        Builds a registry from the query parameters of GET operations in an OpenAPI schema of the MERMAID API,
+        extending the known filters. Assign it to Client.filter_registry, or to BaseClient.filter_registry for every
+        client.
+        :param schema: OpenAPI schema.
+        :type schema: dict
+        :param filters: (optional) filter names by resource to extend. Defaults to FILTERS.
+        :type filters: dict
+        :return: FilterRegistry class object.
+        """
+        merged = {resource: set(names) for resource, names in (filters or FILTERS).items()}
+        for path, operations in (schema.get("paths") or {}).items():
+            # Collection paths, eg. '/v1/projects/{project_pk}/obstransectbeltfishs/'.
+            resource = path.strip("/").split("/")[-1]
+            if not resource or resource.startswith("{"):
+                continue
+            for parameter in (operations.get("get") or {}).get("parameters") or []:
+                name = parameter.get("name")
+                if parameter.get("in") == "query" and name not in _NON_FILTER_PARAMETERS:
+                    merged.setdefault(resource, set()).add(name)
+        return cls(merged)
+
+
+# Registry shared by every client.
+REGISTRY = FilterRegistry()
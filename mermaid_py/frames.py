@@ -0,0 +1,246 @@
+# Output modes of Client getters.
+OUTPUTS = ["frame", "arrow"]
+
+# Columns shared by MERMAID resources.
+COMMON_SCHEMA = {
+    "created_on": "datetime",
+    "updated_on": "datetime",
+    "created_by": "category",
+    "updated_by": "category",
+}
+
+# Column types per resource. Columns not listed keep the type inferred from their values, or are strings where pages
+# of records disagree, eg. numbers in one page and text in another.
+SCHEMAS = {
+    "obstransectbeltfishs": {
+        "beltfish": "category",
+        "fish_attribute": "category",
+        "size_bin": "category",
+        "size": "float",
+        "count": "float",
+    },
+    "obsbenthiclits": {
+        "benthiclit": "category",
+        "attribute": "category",
+        "growth_form": "category",
+        "length": "float",
+    },
+    "obsbenthicpits": {
+        "benthicpit": "category",
+        "attribute": "category",
+        "growth_form": "category",
+        "interval": "float",
+    },
+    "obshabitatcomplexities": {
+        "habitatcomplexity": "category",
+        "score": "category",
+        "interval": "float",
+    },
+    "obscoloniesbleached": {
+        "bleachingquadratcollection": "category",
+        "attribute": "category",
+        "growth_form": "category",
+    },
+    "obsquadratbenthicpercent": {
+        "bleachingquadratcollection": "category",
+        "quadrat_number": "float",
+        "percent_hard": "float",
+        "percent_soft": "float",
+        "percent_algae": "float",
+    },
+    "fishbelttransects": {
+        "sample_event": "category",
+        "width": "category",
+        "size_bin": "category",
+        "len_surveyed": "float",
+    },
+    "benthictransects": {
+        "sample_event": "category",
+        "len_surveyed": "float",
+    },
+    "quadratcollections": {
+        "sample_event": "category",
+        "quadrat_size": "float",
+    },
+    "sampleevents": {
+        "site": "category",
+        "management": "category",
+        "sample_date": "date",
+    },
+}
+
+
+def _import(module: str, extra: str):
+    try:
+        return __import__(module)
+    except ImportError:
+        raise ImportError(
+            f"{module} is required for output, install with: pip install mermaid-py[{extra}]"
+        )
+
+
+def flatten(record: dict, sep: str = "__", prefix: str = ""):
+    """
+    Flattens nested dicts of a record into one level, eg. {'site': {'name': 'a'}} to {'site__name': 'a'}. Lists are
+    kept as values.
+    :param record: record from the MERMAID API.
+    :type record: dict
+    :param sep: (optional) separator of nested keys. Defaults to (sep='__').
+    :type sep: str
+    :return: flat record.
+    :rtype: dict
+    """
+    flat = {}
+    for key, value in record.items():
+        key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, sep=sep, prefix=f"{key}{sep}"))
+        else:
+            flat[key] = value
+    return flat
+
+
+def _strings(pa, values):
+    # String fallback of values without one Arrow type.
+    return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+
+def _page_array(pa, values, kind: str = None):
+    # Typed array of one page of column values. Category columns stay strings until pages are concatenated.
+    import pyarrow.compute
+
+    if kind == "category":
+        return _strings(pa, values)
+    if kind == "datetime":
+        return pyarrow.compute.cast(_strings(pa, values), pa.timestamp("us", tz="UTC"))
+    if kind == "date":
+        return pyarrow.compute.cast(_strings(pa, values), pa.date32())
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = _strings(pa, values)
+    if kind == "float":
+        array = array.cast(pa.float64())
+    return array
+
+
+def _unify_types(pa, types):
+    # Common type of a column's pages, eg. int64 and double to double, or string where there is none.
+    try:
+        schema = pa.unify_schemas([pa.schema([("column", t)]) for t in types], promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.string()
+    return schema.field("column").type
+
+
+class ColumnBuilder:
+    """
+    Builds columnar output page by page. Each page of records is converted to a typed pyarrow RecordBatch, with the
+    columns of the resource schema at fixed types, so only typed columns are kept in memory. Pages are concatenated
+    when the output is built, columns missing from a page are null.
+    """
+
+    # Records per RecordBatch.
+    page_size = 1000
+
+    def __init__(self, resource: str = None):
+        """
+        :param resource: (optional) resource name selecting the column types from SCHEMAS.
+        :type resource: str
+        """
+        resource = (resource or "").strip("/ ").split("/")[-1]
+        self.schema = dict(COMMON_SCHEMA, **SCHEMAS.get(resource, {}))
+        self.batches = []
+        self.length = 0
+        self._page = []
+
+    def extend(self, records):
+        """
+        Appends records, converting every page_size records to a RecordBatch.
+        :param records: iterable of records.
+        """
+        for record in records:
+            self._page.append(flatten(record) if isinstance(record, dict) else {"value": record})
+            self.length += 1
+            if len(self._page) >= self.page_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Converts the pending records to a RecordBatch.
+        """
+        if not self._page:
+            return
+        pa = _import("pyarrow", "arrow")
+
+        keys = dict.fromkeys(key for flat in self._page for key in flat)
+        arrays = [
+            _page_array(pa, [flat.get(key) for flat in self._page], self.schema.get(key))
+            for key in keys
+        ]
+        self.batches.append(pa.RecordBatch.from_arrays(arrays, names=list(keys)))
+        self._page = []
+
+    def to_arrow(self):
+        """
+        Builds a pyarrow Table, with dictionary encoded, date32, timestamp and float columns typed per the resource
+        schema.
+        :return: pyarrow Table.
+        """
+        pa = _import("pyarrow", "arrow")
+        self.flush()
+
+        types = {}
+        for batch in self.batches:
+            for field in batch.schema:
+                types.setdefault(field.name, []).append(field.type)
+        types = {name: _unify_types(pa, column_types) for name, column_types in types.items()}
+
+        tables = []
+        for batch in self.batches:
+            arrays = [
+                _strings(pa, column.to_pylist())
+                if types[name] == pa.string() and column.type not in (pa.string(), pa.null())
+                else column
+                for name, column in zip(batch.schema.names, batch.columns)
+            ]
+            tables.append(pa.Table.from_arrays(arrays, names=batch.schema.names))
+        if not tables:
+            return pa.table({})
+
+        table = pa.concat_tables(tables, promote_options="permissive")
+        for i, name in enumerate(table.column_names):
+            if self.schema.get(name) == "category":
+                table = table.set_column(i, name, table.column(i).dictionary_encode())
+        return table.unify_dictionaries()
+
+    def to_frame(self):
+        """
+        Builds a pandas DataFrame from the pyarrow Table, with categorical, date, datetime and float columns typed per
+        the resource schema. Dates are naive datetimes at midnight, datetimes are UTC.
+        :return: pandas DataFrame.
+        """
+        _import("pandas", "pandas")
+        _import("pyarrow", "pandas")
+        return self.to_arrow().to_pandas(date_as_object=False)
+
+
+def to_output(records, resource: str, output: str):
+    """
+    Builds columnar output from a stream of records.
+    :param records: iterable of records eg. Client.iter_observations(...).
+    :param resource: resource name selecting the column types.
+    :type resource: str
+    :param output: frame (pandas DataFrame) or arrow (pyarrow Table).
+    :type output: str
+    :return: pandas DataFrame or pyarrow Table.
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"Invalid output: {output}")
+
+    builder = ColumnBuilder(resource)
+    builder.extend(records)
+
+    if output == "frame":
+        return builder.to_frame()
+    return builder.to_arrow()
@@ -0,0 +1,161 @@
+# Related records joined to each observation, in chain order.
+RELATIONS = ("method", "sample_unit", "sample_event", "site", "management")
+# Observation key of its method, method resource, sample unit resource and method key of its sample unit, per
+# observation resource.
+OBSERVATION_RELATIONS = {
+    "obstransectbeltfishs": (
+        "beltfish",
+        "beltfishtransectmethods",
+        "fishbelttransects",
+        "transect",
+    ),
+    "obsbenthicpits": (
+        "benthicpit",
+        "benthicpittransectmethods",
+        "benthictransects",
+        "transect",
+    ),
+    "obsbenthiclits": (
+        "benthiclit",
+        "benthiclittransectmethods",
+        "benthictransects",
+        "transect",
+    ),
+    "obshabitatcomplexities": (
+        "habitatcomplexity",
+        "habitatcomplexitytransectmethods",
+        "benthictransects",
+        "transect",
+    ),
+    "obscoloniesbleached": (
+        "bleachingquadratcollection",
+        "bleachingquadratcollectionmethods",
+        "quadratcollections",
+        "quadrat",
+    ),
+    "obsquadratbenthicpercent": (
+        "bleachingquadratcollection",
+        "bleachingquadratcollectionmethods",
+        "quadratcollections",
+        "quadrat",
+    ),
+}
+
+
+def index_by_id(records):
+    """
+    Indexes records by id.
+    :param records: iterable of records.
+    :return: dict of records by 'id'.
+    :rtype: dict
+    """
+    return {record.get("id"): record for record in records}
+
+
+class ProjectJoin:
+    """
+    Hash indexes of a project's sample unit methods, sample units, sample events, sites and managements, joining
+    observations to them along the observation -> method -> sample unit -> sample event -> site/management chain, eg.
+    beltfish__transect__sample_event. Every lookup is a dict access, and observations are denormalized lazily so they
+    can be streamed from iter_observations.
+
+        join = ProjectJoin.from_client(client, "obstransectbeltfishs", id=project_id)
+        for record in join.denormalize(client.iter_observations(...)):
+            record["sample_event__sample_date"], record["site__name"]
+    """
+
+    def __init__(
+        self,
+        observation: str,
+        methods=(),
+        sample_units=(),
+        sample_events=(),
+        sites=(),
+        managements=(),
+    ):
+        """
+        :param observation: observation resource, see OBSERVATION_RELATIONS.
+        :type observation: str
+        :param methods: sample unit method records, eg. beltfishtransectmethods.
+        :param sample_units: sample unit records, eg. fishbelttransects.
+        :param sample_events: sampleevents records.
+        :param sites: project sites records.
+        :param managements: project managements records.
+        :return ProjectJoin class object.
+        """
+        if observation not in OBSERVATION_RELATIONS:
+            raise ValueError(f"Invalid observation: {observation}")
+        self.observation = observation
+        self.method_key, _, _, self.unit_key = OBSERVATION_RELATIONS[observation]
+        self.methods = index_by_id(methods)
+        self.sample_units = index_by_id(sample_units)
+        self.sample_events = index_by_id(sample_events)
+        self.sites = index_by_id(sites)
+        self.managements = index_by_id(managements)
+
+    @classmethod
+    def from_client(cls, client, observation: str, id: str = None, name: str = None):
+        """
+        Builds the indexes from every page of a project's related resources, one request chain per resource.
+        :param client: MERMAID API Client.
+        :type client: Client
+        :param observation: observation resource.
+        :type observation: str
+        :param id: (optional if 'name' provided) MERMAID project ID. If both id and name are provided, then id is used.
+        :type id: str
+        :param name: (optional if 'id' provided) MERMAID project name.
+        :type name: str
+        :return: ProjectJoin class object.
+        """
+        if observation not in OBSERVATION_RELATIONS:
+            raise ValueError(f"Invalid observation: {observation}")
+        p_id = id or client.get_project_id(name=name)
+        _, methods, units, _ = OBSERVATION_RELATIONS[observation]
+
+        return cls(
+            observation,
+            methods=client.iter_project_resource(methods, id=p_id),
+            sample_units=client.iter_project_resource(units, id=p_id),
+            sample_events=client.iter_project_resource("sampleevents", id=p_id),
+            sites=client.iter_project_resource("sites", id=p_id),
+            managements=client.iter_project_resource("managements", id=p_id),
+        )
+
+    def related(self, observation: dict):
+        """
+        Gets the records an observation references, directly or through its method, sample unit and sample event.
+        :param observation: observation record.
+        :type observation: dict
+        :return: dict of method, sample_unit, sample_event, site and management records, None when missing.
+        :rtype: dict
+        """
+        method = self.methods.get(observation.get(self.method_key))
+        unit = self.sample_units.get(method.get(self.unit_key)) if method else None
+        event = self.sample_events.get(unit.get("sample_event")) if unit else None
+        return {
+            "method": method,
+            "sample_unit": unit,
+            "sample_event": event,
+            "site": self.sites.get(event.get("site")) if event else None,
+            "management": self.managements.get(event.get("management")) if event else None,
+        }
+
+    def denormalize(self, observations, relations=RELATIONS, sep: str = "__"):
+        """
+        Lazily joins observations to their related records, adding the fields of each as '<relation>__<field>', eg.
+        'sample_unit__len_surveyed', 'site__name'.
+        :param observations: iterable of observations, eg. from iter_observations.
+        :param relations: (optional) related records to add. Defaults to every relation in RELATIONS.
+        :type relations: tuple
+        :param sep: (optional) separator of relation and field names. Defaults to (sep='__').
+        :type sep: str
+        :return: generator of denormalized observations.
+        :rtype: generator
+        """
+        for observation in observations:
+            record = dict(observation)
+            related = self.related(observation)
+            for relation in relations:
+                for field, value in (related[relation] or {}).items():
+                    record[f"{relation}{sep}{field}"] = value
+            yield record
@@ -0,0 +1,193 @@
+import contextlib
+import re
+import threading
+
+# Latency histogram bucket upper bounds, in seconds.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, float("inf"))
+
+# Project, sample unit and other ids in resource paths.
+_ID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+
+
+def endpoint_name(resource: str):
+    """
+    Gets the metrics label of a resource path, eg. 'projects/{id}/obstransectbeltfishs' for any project.
+    :param resource: resource path.
+    :type resource: str
+    :return: endpoint label.
+    :rtype: str
+    """
+    return _ID_PATTERN.sub("{id}", (resource or "").split("?")[0].strip("/ "))
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for n, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[n] += 1
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip(map(str, self.buckets), self.counts)),
+        }
+
+
+class Metrics:
+    """
+    Thread-safe request metrics of a Client per endpoint: latency histograms, bytes transferred, pages, retries, errors,
+    cache hits, and time spent on the network versus decoding JSON. Export with to_dict or to_prometheus. Requests are
+    traced as OpenTelemetry spans when opentelemetry-api is installed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tracer = None
+        self.reset()
+
+    def reset(self):
+        """
+        Clears every metric.
+        """
+        with self._lock:
+            self.latency = {}
+            self.counters = {}
+            self.seconds = {}
+
+    def _add(self, metrics: dict, endpoint: str, value):
+        metrics[endpoint] = metrics.get(endpoint, 0) + value
+
+    def increment(self, name: str, resource: str = None, value: float = 1):
+        """
+        Increments a counter, eg. 'requests', 'bytes', 'pages', 'retries', 'errors', 'cache_hits_memory'.
+        :param name: counter name.
+        :type name: str
+        :param resource: (optional) resource path.
+        :type resource: str
+        :param value: (optional) increment. Defaults to (value=1).
+        :type value: float
+        """
+        with self._lock:
+            self._add(self.counters.setdefault(name, {}), endpoint_name(resource), value)
+
+    def observe_request(self, resource: str, seconds: float, size: int = None):
+        """
+        Records a request's network time and response size.
+        :param resource: resource path.
+        :type resource: str
+        :param seconds: time until the response was received.
+        :type seconds: float
+        :param size: (optional) response body size in bytes.
+        :type size: int
+        """
+        endpoint = endpoint_name(resource)
+        with self._lock:
+            if endpoint not in self.latency:
+                self.latency[endpoint] = Histogram()
+            self.latency[endpoint].observe(seconds)
+            self._add(self.seconds.setdefault("network", {}), endpoint, seconds)
+            self._add(self.counters.setdefault("requests", {}), endpoint, 1)
+            if size is not None:
+                self._add(self.counters.setdefault("bytes", {}), endpoint, size)
+
+    def observe_decode(self, resource: str, seconds: float):
+        """
+        Records time spent decoding a JSON response.
+        :param resource: resource path.
+        :type resource: str
+        :param seconds: decoding time.
+        :type seconds: float
+        """
+        with self._lock:
+            self._add(self.seconds.setdefault("decode", {}), endpoint_name(resource), seconds)
+
+    def span(self, resource: str, url: str = None):
+        """
+        Gets an OpenTelemetry span for a request, or a no-op context when opentelemetry-api isn't installed.
+        :param resource: resource path.
+        :type resource: str
+        :param url: (optional) request URL.
+        :type url: str
+        :return: context manager.
+        """
+        if self._tracer is None:
+            try:
+                from opentelemetry import trace
+
+                self._tracer = trace.get_tracer("mermaid_py")
+            except ImportError:
+                self._tracer = False
+        if not self._tracer:
+            return contextlib.nullcontext()
+        return self._tracer.start_as_current_span(
+            f"GET {endpoint_name(resource)}",
+            attributes={"http.method": "GET", "http.url": url or ""},
+        )
+
+    def to_dict(self):
+        """
+        Exports every metric.
+        :return: latency histograms, counters and seconds per endpoint.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "latency": {
+                    endpoint: histogram.to_dict()
+                    for endpoint, histogram in self.latency.items()
+                },
+                "counters": {name: dict(values) for name, values in self.counters.items()},
+                "seconds": {name: dict(values) for name, values in self.seconds.items()},
+            }
+
+    def to_prometheus(self, prefix: str = "mermaid_client"):
+        """
+        Exports every metric in the Prometheus text exposition format.
+        :param prefix: (optional) metric name prefix. Defaults to (prefix='mermaid_client').
+        :type prefix: str
+        :return: metrics text.
+        :rtype: str
+        """
+        metrics = self.to_dict()
+        lines = []
+
+        lines.append(f"# TYPE {prefix}_request_seconds histogram")
+        for endpoint, histogram in metrics["latency"].items():
+            for bound, count in histogram["buckets"].items():
+                le = "+Inf" if bound == "inf" else bound
+                lines.append(
+                    f'{prefix}_request_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {count}'
+                )
+            lines.append(
+                f'{prefix}_request_seconds_sum{{endpoint="{endpoint}"}} {histogram["sum"]}'
+            )
+            lines.append(
+                f'{prefix}_request_seconds_count{{endpoint="{endpoint}"}} {histogram["count"]}'
+            )
+
+        for name, values in metrics["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for endpoint, value in values.items():
+                lines.append(f'{prefix}_{name}_total{{endpoint="{endpoint}"}} {value}')
+
+        for name, values in metrics["seconds"].items():
+            lines.append(f"# TYPE {prefix}_{name}_seconds_total counter")
+            for endpoint, value in values.items():
+                lines.append(f'{prefix}_{name}_seconds_total{{endpoint="{endpoint}"}} {value}')
+
+        return "\n".join(lines) + "\n"
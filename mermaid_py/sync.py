@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import threading
+
+
+class SyncStore:
+    """
+    Local SQLite store of MERMAID project records with the last sync watermark per project and resource. Used by
+    Client.sync_project_resource to fetch only records added, modified or removed since the previous sync.
+    """
+
+    def __init__(self, path: str = "mermaid.sqlite"):
+        """
+        :param path: (optional) SQLite database file. Defaults to (path='mermaid.sqlite').
+        :type path: str
+        :return SyncStore class object.
+        """
+        self.path = os.path.expanduser(path)
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # One connection shared across threads, serialized by the lock.
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    project TEXT NOT NULL,
+                    resource TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (project, resource, id)
+                )
+                """
+            )
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    project TEXT NOT NULL,
+                    resource TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    PRIMARY KEY (project, resource)
+                )
+                """
+            )
+
+    def watermark(self, project: str, resource: str):
+        """
+        Gets the timestamp of the last sync.
+        :param project: MERMAID project ID.
+        :type project: str
+        :param resource: project resource.
+        :type resource: str
+        :return: ISO 8601 timestamp, None if never synced.
+        :rtype: str
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT timestamp FROM watermarks WHERE project = ? AND resource = ?",
+                (project, resource),
+            ).fetchone()
+        return row[0] if row else None
+
+    def replace(self, project: str, resource: str, records, timestamp: str):
+        """
+        Replaces every record of a project resource, eg. on the first sync.
+        :param project: MERMAID project ID.
+        :type project: str
+        :param resource: project resource.
+        :type resource: str
+        :param records: iterable of records.
+        :param timestamp: sync watermark.
+        :type timestamp: str
+        :return: number of records stored.
+        :rtype: int
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM records WHERE project = ? AND resource = ?",
+                (project, resource),
+            )
+            count = self._upsert(project, resource, records)
+            self._set_watermark(project, resource, timestamp)
+        return count
+
+    def apply(
+        self,
+        project: str,
+        resource: str,
+        added=(),
+        modified=(),
+        removed=(),
+        timestamp: str = None,
+    ):
+        """
+        Merges changes into a project resource and moves its watermark, in one transaction.
+        :param project: MERMAID project ID.
+        :type project: str
+        :param resource: project resource.
+        :type resource: str
+        :param added: added records.
+        :param modified: modified records.
+        :param removed: IDs of removed records.
+        :param timestamp: sync watermark.
+        :type timestamp: str
+        """
+        with self._lock, self._db:
+            self._upsert(project, resource, added)
+            self._upsert(project, resource, modified)
+            self._db.executemany(
+                "DELETE FROM records WHERE project = ? AND resource = ? AND id = ?",
+                ((project, resource, str(id)) for id in removed),
+            )
+            if timestamp:
+                self._set_watermark(project, resource, timestamp)
+
+    def records(self, project: str, resource: str):
+        """
+        Iterates the stored records of a project resource, ordered by id.
+        :param project: MERMAID project ID.
+        :type project: str
+        :param resource: project resource.
+        :type resource: str
+        :return: generator of records.
+        :rtype: generator
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM records WHERE project = ? AND resource = ? ORDER BY id",
+                (project, resource),
+            ).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def _upsert(self, project: str, resource: str, records):
+        count = 0
+
+        # Streams records into the database without holding them all in memory.
+        def rows():
+            nonlocal count
+            for record in records:
+                count += 1
+                yield project, resource, str(record["id"]), json.dumps(record)
+
+        self._db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", rows())
+        return count
+
+    def _set_watermark(self, project: str, resource: str, timestamp: str):
+        self._db.execute(
+            "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)",
+            (project, resource, timestamp),
+        )
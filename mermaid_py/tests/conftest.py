@@ -0,0 +1,9 @@
+import pytest
+from .mock_api import MockMermaidAPI
+
+
+@pytest.fixture(scope="module")
+def api(request):
+    # Local MockMermaidAPI shared by the tests of a module, configured by the module's MOCK_API options.
+    with MockMermaidAPI(**getattr(request.module, "MOCK_API", {})) as api:
+        yield api
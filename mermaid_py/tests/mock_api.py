@@ -0,0 +1,343 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Namespace of deterministic synthetic ids.
+NAMESPACE = uuid.UUID("6f1c2b5e-3c1a-4c4e-9d55-0b8f7e1f1a10")
+
+
+def synthetic_id(*parts):
+    return str(uuid.uuid5(NAMESPACE, "/".join(map(str, parts))))
+
+
+class MockMermaidAPI:
+    """
+    Local stand-in for the MERMAID API serving synthetic, paginated projects, sample events, sample units,
+    observations and fish attributes over HTTP, with a configurable latency per request.
+
+        with MockMermaidAPI(projects=5, observations=1000) as api:
+            client = Client(url=api.url)
+    """
+
+    def __init__(
+        self,
+        projects: int = 10,
+        sample_events: int = 10,
+        observations: int = 1000,
+        species: int = 200,
+        page_size: int = 100,
+        latency: float = 0.0,
+    ):
+        """
+        :param projects: number of projects.
+        :param sample_events: sample events, and belt fish transects, per project.
+        :param observations: belt fish observations per project.
+        :param species: number of fish species.
+        :param page_size: records per page.
+        :param latency: seconds slept before each response.
+        """
+        self.page_size = page_size
+        self.latency = latency
+        # Seconds the server clock runs ahead of the local clock, negative when behind.
+        self.clock_offset = 0.0
+        # Removed record ids and server times, by project and resource, served by the updates endpoints.
+        self.removed = {}
+        # Queued failures by resource name, eg. {'fishspecies': [(503, None), (429, '1')]}, see fail.
+        self.failures = {}
+        # Responses answered 304 Not Modified to conditional requests.
+        self.not_modified = 0
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+        families = [{"id": synthetic_id("family", n), "name": f"Family {n}"} for n in range(10)]
+        genera = [
+            {
+                "id": synthetic_id("genus", n),
+                "name": f"Genus {n}",
+                "family": families[n % len(families)]["id"],
+            }
+            for n in range(40)
+        ]
+        self.species = [
+            {
+                "id": synthetic_id("species", n),
+                "name": f"species {n}",
+                "display_name": f"Genus {n % len(genera)} species {n}",
+                "genus": genera[n % len(genera)]["id"],
+                "biomass_constant_a": 0.01 + n * 0.0001,
+                "biomass_constant_b": 3.0,
+                "biomass_constant_c": 1.0,
+                "trophic_group": "herbivore-detritivore",
+            }
+            for n in range(species)
+        ]
+        self.resources = {
+            "fishfamilies": families,
+            "fishgenera": genera,
+            "fishspecies": self.species,
+            "fishgroupings": [],
+            "benthicattributes": [],
+        }
+
+        self.choices = [
+            {
+                "name": "belttransectwidths",
+                "data": [
+                    {
+                        "id": synthetic_id("width", 5),
+                        "name": "5m",
+                        "conditions": [{"val": 5, "size": None, "operator": None}],
+                    }
+                ],
+            }
+        ]
+
+        self.projects = []
+        self.project_resources = {}
+        for p in range(projects):
+            project_id = synthetic_id("project", p)
+            self.projects.append({"id": project_id, "name": f"Project {p}"})
+
+            site_id = synthetic_id(project_id, "site")
+            events, transects, methods, obs = [], [], [], []
+            for e in range(sample_events):
+                event_id = synthetic_id(project_id, "event", e)
+                transect_id = synthetic_id(project_id, "transect", e)
+                method_id = synthetic_id(project_id, "method", e)
+                events.append(
+                    {
+                        "id": event_id,
+                        "site": site_id,
+                        "management": synthetic_id(project_id, "management"),
+                        "sample_date": f"2020-01-{e % 28 + 1:02d}",
+                    }
+                )
+                transects.append(
+                    {
+                        "id": transect_id,
+                        "sample_event": event_id,
+                        "len_surveyed": 50,
+                        "width": synthetic_id("width", 5),
+                        "number": e,
+                    }
+                )
+                methods.append({"id": method_id, "transect": transect_id})
+            for o in range(observations):
+                obs.append(
+                    {
+                        "id": synthetic_id(project_id, "obs", o),
+                        "beltfish": methods[o % len(methods)]["id"] if methods else None,
+                        "fish_attribute": self.species[o % len(self.species)]["id"],
+                        "size_bin": synthetic_id("sizebin", 1),
+                        "size": 5.0 + o % 30,
+                        "count": 1 + o % 5,
+                        "created_on": "2020-01-01T00:00:00Z",
+                        "updated_on": "2020-01-02T00:00:00Z",
+                        "notes": "",
+                    }
+                )
+            self.project_resources[project_id] = {
+                "sites": [{"id": site_id, "name": f"Site {p}"}],
+                "managements": [{"id": synthetic_id(project_id, "management"), "name": "MR"}],
+                "sampleevents": events,
+                "fishbelttransects": transects,
+                "beltfishtransectmethods": methods,
+                "obstransectbeltfishs": obs,
+                "collectrecords": [],
+            }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, Nagle would delay each response.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                api._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/v1"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def request_count(self):
+        with self._lock:
+            return sum(self.requests.values())
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+
+    def fail(self, resource: str, *statuses, retry_after: str = None):
+        # Answers the next requests of a resource, eg. 'fishspecies', with these statuses.
+        with self._lock:
+            self.failures.setdefault(resource, []).extend(
+                (status, retry_after) for status in statuses
+            )
+
+    def now(self):
+        # Server time.
+        return datetime.now(timezone.utc) + timedelta(seconds=self.clock_offset)
+
+    def add_record(self, project: str, resource: str, record: dict):
+        stamp = self.now().isoformat()
+        with self._lock:
+            self.project_resources[project][resource].append(
+                dict(record, created_on=stamp, updated_on=stamp)
+            )
+
+    def update_record(self, project: str, resource: str, id: str, **fields):
+        with self._lock:
+            for record in self.project_resources[project][resource]:
+                if record["id"] == id:
+                    record.update(fields, updated_on=self.now().isoformat())
+
+    def remove_record(self, project: str, resource: str, id: str):
+        with self._lock:
+            records = self.project_resources[project][resource]
+            records[:] = [record for record in records if record["id"] != id]
+            self.removed.setdefault((project, resource), []).append((id, self.now()))
+
+    def _updates(self, project: str, resource: str, timestamp: str):
+        # Records added, modified and removed after a timestamp, like the API's updates endpoints.
+        since = datetime.fromisoformat(timestamp)
+        updates = {"added": [], "modified": [], "removed": []}
+        for record in self.project_resources[project].get(resource) or []:
+            created_on = datetime.fromisoformat(record.get("created_on", "2020-01-01T00:00:00Z"))
+            updated_on = datetime.fromisoformat(record.get("updated_on", "2020-01-01T00:00:00Z"))
+            if created_on > since:
+                updates["added"].append(record)
+            elif updated_on > since:
+                updates["modified"].append(record)
+        for id, removed_on in self.removed.get((project, resource), []):
+            if removed_on > since:
+                updates["removed"].append({"id": id})
+        return updates
+
+    def _route(self, path: str):
+        parts = [part for part in path.split("/") if part][1:]
+        if parts == ["projects"]:
+            return self.projects
+        if len(parts) == 1 and parts[0] in self.resources:
+            return self.resources[parts[0]]
+        if len(parts) >= 2 and parts[0] == "projects" and parts[1] in self.project_resources:
+            if len(parts) == 2:
+                return next(p for p in self.projects if p["id"] == parts[1])
+            return self.project_resources[parts[1]].get(parts[2])
+        return None
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        split = urlsplit(handler.path)
+        with self._lock:
+            self.requests[split.path.rstrip("/")] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            failures = self.failures.get(split.path.rstrip("/").split("/")[-1])
+            failure = failures.pop(0) if failures else None
+        if failure:
+            status, retry_after = failure
+            headers = {"Retry-After": retry_after} if retry_after is not None else {}
+            return self._respond(handler, status, {"detail": "Failed."}, headers)
+
+        token = handler.headers.get("Authorization", "Bearer None")
+        if split.path.rstrip("/").endswith("/collectrecords") and token == "Bearer None":
+            # Collect records are only readable by project members.
+            return self._respond(handler, 401, {"detail": "Authentication required."})
+        if split.path.rstrip("/").endswith("/choices"):
+            return self._respond(handler, 200, self.choices)
+        parts = [part for part in split.path.split("/") if part]
+        if len(parts) >= 4 and parts[-1] == "updates" and parts[-4] == "projects":
+            with self._lock:
+                updates = self._updates(
+                    parts[-3], parts[-2], dict(parse_qsl(split.query))["timestamp"]
+                )
+            return self._respond(handler, 200, updates)
+        data = self._route(split.path)
+        if data is None:
+            return self._respond(handler, 404, {"detail": "Not found."})
+        if isinstance(data, dict):
+            return self._respond(handler, 200, data)
+
+        query = parse_qsl(split.query, keep_blank_values=True)
+        params = dict(query)
+        page = int(params.get("page") or 1)
+        limit = int(params.get("limit") or self.page_size)
+        data = self._filter(data, params)
+        results = data[(page - 1) * limit : page * limit]
+
+        next_url = None
+        if page * limit < len(data):
+            next_query = [(k, v) for k, v in query if k != "page"] + [("page", str(page + 1))]
+            host = f"http://{handler.headers['Host']}"
+            next_url = f"{host}{split.path}?{urlencode(next_query)}"
+
+        self._respond(
+            handler,
+            200,
+            {"count": len(data), "next": next_url, "previous": None, "results": results},
+        )
+
+    @staticmethod
+    def _filter(data: list, params: dict):
+        # Range filters, eg. size_min, sample_date_after, and exact matches on record fields.
+        for key, value in params.items():
+            if not value or key in ("page", "limit"):
+                continue
+            for suffix, keep in (
+                ("_min", lambda v, bound: v >= float(bound)),
+                ("_max", lambda v, bound: v <= float(bound)),
+                ("_after", lambda v, bound: v >= bound),
+                ("_before", lambda v, bound: v <= bound),
+            ):
+                field = key[: -len(suffix)]
+                if key.endswith(suffix) and data and field in data[0]:
+                    data = [record for record in data if keep(record[field], value)]
+                    break
+            else:
+                if data and key in data[0]:
+                    data = [record for record in data if record[key] == value]
+        return data
+
+    def _respond(self, handler: BaseHTTPRequestHandler, status: int, body, headers: dict = None):
+        payload = json.dumps(body).encode("utf-8")
+        headers = dict(headers or {})
+        if status == 200:
+            # Responses carry an ETag, conditional requests for unchanged ones are answered 304.
+            headers["ETag"] = '"%s"' % hashlib.sha1(payload).hexdigest()
+            if handler.headers.get("If-None-Match") == headers["ETag"]:
+                with self._lock:
+                    self.not_modified += 1
+                status, payload = 304, b""
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
@@ -0,0 +1,187 @@
+import pytest
+from ..aggregation import *
+from ..catalog import TaxonomyCatalog
+from ..client import Client
+from ..exceptions import InvalidResourceException
+from ..joins import OBSERVATION_RELATIONS
+from .mock_api import MockMermaidAPI
+
+
+@pytest.fixture
+def catalog():
+    return TaxonomyCatalog(
+        families=[
+            {
+                "id": "f1",
+                "name": "Acanthuridae",
+                "biomass_constant_a": 0.02,
+                "biomass_constant_b": 3.0,
+                "biomass_constant_c": 1.0,
+            }
+        ],
+        genera=[{"id": "g1", "name": "Acanthurus", "family": "f1"}],
+        species=[
+            {
+                "id": "s1",
+                "name": "lineatus",
+                "genus": "g1",
+                "biomass_constant_a": 0.01,
+                "biomass_constant_b": 3.0,
+                "biomass_constant_c": 1.0,
+                "trophic_group": "herbivore",
+            }
+        ],
+        benthic_attributes=[
+            {"id": "b1", "name": "Hard coral", "parent": None},
+            {"id": "b2", "name": "Acropora", "parent": "b1"},
+            {"id": "b3", "name": "Sand", "parent": None},
+        ],
+    )
+
+
+@pytest.fixture
+def sample_units():
+    return sample_unit_index(
+        methods=[{"id": "m1", "transect": "t1"}, {"id": "m2", "transect": "t2"}],
+        sample_units=[
+            {"id": "t1", "sample_event": "e1", "len_surveyed": 50, "width": "w5"},
+            {"id": "t2", "sample_event": "e1", "len_surveyed": 50, "width": 10},
+        ],
+        sample_events=[{"id": "e1", "site": "s1"}],
+        project="p1",
+    )
+
+
+def test_sample_unit_index(sample_units):
+    assert sample_units["m1"] == {
+        "sample_unit": "t1",
+        "sample_event": "e1",
+        "site": "s1",
+        "project": "p1",
+        "len_surveyed": 50,
+        "width": "w5",
+    }
+
+
+def test_belt_width():
+    conditions = [
+        {"val": 5, "operator": "<", "size": 35},
+        {"val": 20, "operator": ">=", "size": 35},
+    ]
+    assert belt_width(conditions, 10) == 5
+    assert belt_width(conditions, 50) == 20
+    assert belt_width([{"val": 5, "operator": None, "size": None}], 50) == 5
+    assert belt_width(10) == 10
+
+
+def test_observation_methods():
+    for observation, relations in OBSERVATION_METHODS.items():
+        assert relations is OBSERVATION_RELATIONS[observation]
+
+
+def test_fish_biomass(catalog, sample_units):
+    aggregator = FishBiomass(catalog, sample_units, widths={"w5": 5})
+    # Pages are added as they arrive, the genus falls back to its family's constants.
+    aggregator.add([{"beltfish": "m1", "fish_attribute": "s1", "size": 10, "count": 2}])
+    aggregator.add([{"beltfish": "m1", "fish_attribute": "g1", "size": 10, "count": 1}])
+
+    units = aggregator.rollup()
+    # 2 * 0.01 * 10^3 + 0.02 * 10^3 = 40 g over 250 m2.
+    assert units["m1"]["biomass_kgha"] == pytest.approx(1.6)
+    assert units["m1"]["biomass_kgha_by_trophic_group"] == {
+        "herbivore": pytest.approx(0.8),
+        None: pytest.approx(0.8),
+    }
+    # m2 has no observations.
+    assert units["m2"]["biomass_kgha"] == 0
+
+    events = aggregator.rollup("sample_event")
+    assert events["e1"]["biomass_kgha"] == pytest.approx(0.8)
+    assert events["e1"]["biomass_kgha_by_trophic_group"]["herbivore"] == pytest.approx(0.4)
+    assert aggregator.rollup("project")["p1"]["biomass_kgha"] == pytest.approx(0.8)
+
+    with pytest.raises(ValueError):
+        aggregator.rollup("country")
+
+
+def test_benthic_cover(catalog, sample_units):
+    pits = BenthicCover(catalog, sample_units).add(
+        [
+            {"benthicpit": "m1", "attribute": "b2"},
+            {"benthicpit": "m1", "attribute": "b2"},
+            {"benthicpit": "m1", "attribute": "b1"},
+            {"benthicpit": "m1", "attribute": "b3"},
+        ]
+    )
+    assert pits.rollup()["m1"]["percent_cover"] == {"Hard coral": 75, "Sand": 25}
+
+    lits = BenthicCover(catalog, sample_units, "obsbenthiclits").add(
+        [
+            {"benthiclit": "m2", "attribute": "b2", "length": 100},
+            {"benthiclit": "m2", "attribute": "b3", "length": 300},
+        ]
+    )
+    assert lits.rollup()["m2"]["percent_cover"] == {"Hard coral": 25, "Sand": 75}
+
+
+def test_quadrat_cover(sample_units):
+    quadrats = QuadratCover(sample_units).add(
+        [
+            {"bleachingquadratcollection": "m1", "percent_hard": 10, "percent_soft": 0},
+            {"bleachingquadratcollection": "m1", "percent_hard": 30, "percent_algae": 20},
+        ]
+    )
+    assert quadrats.rollup()["m1"] == {"percent_hard": 20, "percent_soft": 0, "percent_algae": 10}
+
+
+def test_aggregator_hooks():
+    class Counts(Aggregator):
+        method_key = "beltfish"
+
+        def _accumulate(self, totals, observation):
+            totals["count"] = totals.get("count", 0) + 1
+
+    # Aggregators missing a hook fail on creation.
+    with pytest.raises(TypeError):
+        Counts({})
+
+
+def test_aggregate_filtered_observations():
+    with MockMermaidAPI(projects=1, sample_events=4, observations=200, species=5) as api:
+        client = Client(url=api.url)
+        project_id = api.projects[0]["id"]
+        method = api.project_resources[project_id]["beltfishtransectmethods"][0]["id"]
+
+        aggregator = client.aggregate_observations(
+            "obstransectbeltfishs", id=project_id, filters={"beltfish": method}
+        )
+
+        # Transects excluded by the filter aren't rolled up as 0 biomass.
+        units = aggregator.rollup()
+        assert list(units) == [method]
+        assert aggregator.rollup("project")[project_id]["biomass_kgha"] == pytest.approx(
+            units[method]["biomass_kgha"]
+        )
+
+
+def test_aggregate_observations():
+    with MockMermaidAPI(projects=1, sample_events=4, observations=200, species=5) as api:
+        client = Client(url=api.url, stream=True)
+        project_id = api.projects[0]["id"]
+
+        aggregator = client.aggregate_observations("obstransectbeltfishs", id=project_id)
+
+        units = aggregator.rollup()
+        assert len(units) == 4
+        assert all(unit["biomass_kgha"] > 0 for unit in units.values())
+        sites = aggregator.rollup("site")
+        assert list(sites) == [api.project_resources[project_id]["sites"][0]["id"]]
+        assert aggregator.rollup("project")[project_id]["biomass_kgha"] == pytest.approx(
+            sum(unit["biomass_kgha"] for unit in units.values()) / 4
+        )
+
+        # Observation filters are validated like iter_observations, before any request.
+        api.reset()
+        with pytest.raises(InvalidResourceException):
+            client.aggregate_observations("obstransectbeltfishs", id=project_id, filters={"score": 1})
+        assert api.request_count == 0
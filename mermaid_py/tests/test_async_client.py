@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from ..client import Client
+from ..async_client import AsyncClient
+from ..exceptions import *
+from .mock_api import MockMermaidAPI
+from .test_client import valid_token, valid_id, fail_resource
+
+client = Client(token=valid_token)
+
+
+def run(coroutine_fn):
+    async def with_client():
+        async with AsyncClient(token=valid_token) as async_client:
+            return await coroutine_fn(async_client)
+
+    return asyncio.run(with_client())
+
+
+@pytest.mark.parametrize("npr", [fail_resource, "health", "version", "projecttags"])
+@pytest.mark.client_info
+def test_get_info(npr):
+    if npr == fail_resource:
+        with pytest.raises(InvalidResourceException):
+            run(lambda c: c.get_info(npr))
+    else:
+        assert run(lambda c: c.get_info(npr)) == client.get_info(npr)
+
+
+@pytest.mark.parametrize("resource", ["fishfamilies", "projects"])
+@pytest.mark.client_info
+def test_fetch_all(resource):
+    assert run(lambda c: c.fetch_all(resource)) == client.fetch_all(resource)
+
+
+@pytest.mark.client_project
+def test_get_sample_events():
+    async def gather_events(c):
+        return await asyncio.gather(
+            c.get_sample_events(id=valid_id),
+            c.get_sample_events(
+                filter="sample_date_after", filter_val="2018-11-16", id=valid_id
+            ),
+        )
+
+    assert run(gather_events) == [
+        client.get_sample_events(id=valid_id),
+        client.get_sample_events(
+            filter="sample_date_after", filter_val="2018-11-16", id=valid_id
+        ),
+    ]
+
+
+def test_single_flight():
+    async def gather_species(url):
+        async with AsyncClient(url=url) as c:
+            return await asyncio.gather(*(c.get_fish_species() for _ in range(8)))
+
+    with MockMermaidAPI(projects=2, latency=0.2) as api:
+        responses = asyncio.run(gather_species(api.url))
+
+        assert api.request_count == 1
+        assert all(response == responses[0] for response in responses)
+
+
+def test_project_index():
+    async def lookups(url):
+        async with AsyncClient(url=url) as c:
+            first = await asyncio.gather(*(c.get_project_id("Project 3") for _ in range(4)))
+            api.reset()
+            second = await c.get_project(name="Project 3")
+            assert api.request_count == 0
+
+            with pytest.raises(InvalidProjectException):
+                await c.get_project_id("Unknown")
+            c.invalidate_project_index()
+            await c.lookup_project(id=first[0])
+            return first, second
+
+    with MockMermaidAPI(projects=5, page_size=2) as api:
+        first, second = asyncio.run(lookups(api.url))
+
+        assert first == [api.projects[3]["id"]] * 4
+        assert second["id"] == api.projects[3]["id"]
+        # Rebuilt once after invalidation, 3 pages of 2 projects.
+        assert api.request_count == 3
+
+
+def test_retry_after_max():
+    async def fetch(url):
+        async with AsyncClient(url=url, retries=1) as c:
+            return await c.get_fish_species()
+
+    with MockMermaidAPI(projects=1) as api:
+        # Retry-After longer than backoff_max raises at once instead of blocking.
+        api.fail("fishspecies", 429, retry_after="3600")
+        with pytest.raises(RateLimitedException) as e:
+            asyncio.run(fetch(api.url))
+        assert e.value.retry_after == 3600
+        assert api.request_count == 1
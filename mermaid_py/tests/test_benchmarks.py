@@ -0,0 +1,118 @@
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+from ..client import Client
+
+# Benchmarks always compare request counts with the baseline. Wall clock time and memory depend on the machine the
+# baseline was recorded on, so they're only measured on request, with MERMAID_BENCHMARK=1. Run with
+# MERMAID_BENCHMARK_UPDATE=1 to record a new baseline on the machine running them, MERMAID_BENCHMARK_RESULTS=<path> to
+# store results.
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+UPDATE_BASELINE = os.environ.get("MERMAID_BENCHMARK_UPDATE") == "1"
+RUN_BENCHMARKS = os.environ.get("MERMAID_BENCHMARK") == "1" or UPDATE_BASELINE
+RESULTS_PATH = os.environ.get("MERMAID_BENCHMARK_RESULTS")
+# Allowed slowdown and memory growth over the baseline before a benchmark fails.
+TOLERANCE = float(os.environ.get("MERMAID_BENCHMARK_TOLERANCE", 2.0))
+
+pytestmark = pytest.mark.benchmark
+MOCK_API = {
+    "projects": 10,
+    "sample_events": 20,
+    "observations": 5000,
+    "page_size": 100,
+    "latency": 0.005,
+}
+
+
+@pytest.fixture(scope="module")
+def results():
+    results = {}
+    yield results
+
+    if RESULTS_PATH:
+        with open(RESULTS_PATH, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if UPDATE_BASELINE:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+def export_observations(api, **options):
+    client = Client(url=api.url, **options)
+    project_id = api.projects[0]["id"]
+    for _ in client.iter_project_resource("obstransectbeltfishs", id=project_id):
+        pass
+
+
+def bulk_observations(api):
+    client = Client(url=api.url, max_workers=8)
+    project_ids = [project["id"] for project in api.projects]
+    for _ in client.get_observations_bulk("obstransectbeltfishs", project_ids):
+        pass
+
+
+def bulk_sample_events(api):
+    client = Client(url=api.url, max_workers=8)
+    project_ids = [project["id"] for project in api.projects]
+    for _ in client.get_sample_events_bulk(project_ids):
+        pass
+
+
+def name_lookups(api):
+    client = Client(url=api.url)
+    for project in api.projects:
+        client.get_sample_events(name=project["name"])
+        client.get_sample_units("fishbelttransects", name=project["name"])
+
+
+benchmarks = {
+    "export_observations_serial": lambda api: export_observations(api),
+    "export_observations_concurrent": lambda api: export_observations(api, max_workers=8),
+    "export_observations_streaming": lambda api: export_observations(api, stream=True),
+    "bulk_observations": bulk_observations,
+    "bulk_sample_events": bulk_sample_events,
+    "name_lookups": name_lookups,
+}
+
+
+def measure(api, workload):
+    # Time and request counts are measured without tracemalloc, which slows allocations down.
+    api.reset()
+    start = time.perf_counter()
+    workload(api)
+    seconds = time.perf_counter() - start
+    requests = api.request_count
+    if not RUN_BENCHMARKS:
+        return {"requests": requests}
+
+    tracemalloc.start()
+    workload(api)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": round(seconds, 4),
+        "peak_mb": round(peak / 2**20, 3),
+        "requests": requests,
+    }
+
+
+@pytest.mark.parametrize("name", list(benchmarks))
+def test_benchmark(api, results, name):
+    result = results[name] = measure(api, benchmarks[name])
+
+    if UPDATE_BASELINE or not os.path.exists(BASELINE_PATH):
+        pytest.skip("Recording benchmark baseline")
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)[name]
+
+    assert result["requests"] <= baseline["requests"]
+    if not RUN_BENCHMARKS:
+        return
+    # Small absolute slack keeps very short benchmarks from failing on noise.
+    assert result["seconds"] <= baseline["seconds"] * TOLERANCE + 0.05
+    assert result["peak_mb"] <= baseline["peak_mb"] * TOLERANCE + 1
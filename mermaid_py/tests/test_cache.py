@@ -0,0 +1,126 @@
+import pytest
+from ..cache import *
+from ..client import Client
+from .mock_api import MockMermaidAPI
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "responses.sqlite"), max_size=10)
+
+
+def test_policy(cache):
+    assert cache.policy("fishspecies").ttl == 24 * 60 * 60
+    assert cache.policy("/choices/").ttl == 24 * 60 * 60
+    assert cache.policy("projects") is None
+
+
+def test_key():
+    url = "https://dev-api.datamermaid.org/v1/fishspecies"
+    # Keys depend on URL and auth identity.
+    assert ResponseCache.key(url, "a") == ResponseCache.key(url, "a")
+    assert ResponseCache.key(url, "a") != ResponseCache.key(url, "b")
+    assert ResponseCache.key(url) != ResponseCache.key(f"{url}?page=2")
+
+
+def test_get_set_touch(cache):
+    assert cache.get("key") is None
+    cache.set("key", b"[]", etag='"abc"', last_modified="Wed, 21 Oct 2015 07:28:00 GMT")
+    entry = cache.get("key")
+    assert entry["body"] == b"[]"
+    assert entry["etag"] == '"abc"'
+
+    cache.touch("key")
+    assert cache.get("key")["stored_at"] >= entry["stored_at"]
+
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_size_eviction(cache):
+    cache.set("first", b"123456")
+    cache.get("first")
+    cache.set("second", b"123456")
+    # Least recently used entry is evicted once max_size is exceeded.
+    assert cache.get("first") is None
+    assert cache.get("second")["body"] == b"123456"
+
+
+def test_age_eviction(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"), max_age=-1)
+    cache.set("key", b"[]")
+    assert cache.get("key") is None
+
+
+def test_memory_cache():
+    memory_cache = MemoryCache(maxsize=2, ttls={"fishsizes": None, "choices": -1})
+    assert "fishspecies" in memory_cache
+    assert "projects" not in memory_cache
+
+    assert memory_cache.get("a", "fishspecies") == (False, None)
+    memory_cache.set("a", [1], "fishspecies")
+    assert memory_cache.get("a", "fishspecies") == (True, [1])
+
+    # Expired entries are misses.
+    memory_cache.set("b", [2], "choices")
+    assert memory_cache.get("b", "choices") == (False, None)
+
+    # Least recently used entry is evicted once maxsize is exceeded.
+    memory_cache.set("c", [3], "fishsizes")
+    memory_cache.set("d", [4], "fishsizes")
+    assert memory_cache.get("a", "fishspecies") == (False, None)
+    assert memory_cache.stats() == {"hits": 1, "misses": 3, "evictions": 2, "size": 2}
+
+
+def test_client_revalidation(tmp_path):
+    cache = ResponseCache(
+        path=str(tmp_path / "responses.sqlite"), policies={"fishspecies": CachePolicy(ttl=None)}
+    )
+    with MockMermaidAPI(projects=1) as api:
+        client = Client(url=api.url, cache=cache)
+        sent = []
+        client.add_hook("pre_request", lambda prepped, resource: sent.append(dict(prepped.headers)))
+
+        species = client.get_fish_species()
+        assert "If-None-Match" not in sent[0]
+
+        # Stale responses are revalidated with their ETag and served from disk on 304.
+        assert client.get_fish_species() == species
+        assert sent[1]["If-None-Match"].startswith('"')
+        assert api.not_modified == 1
+        assert client.metrics.counters["cache_hits_revalidated"]["fishspecies"] == 1
+
+
+def test_client_fresh_hit(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"))
+    with MockMermaidAPI(projects=1) as api:
+        client = Client(url=api.url, cache=cache)
+        species = client.get_fish_species()
+
+        # Fresh responses are served without a request, also to new clients.
+        api.reset()
+        assert Client(url=api.url, cache=cache).get_fish_species() == species
+        assert api.request_count == 0
+
+
+def test_client_memory_cache():
+    memory_cache = MemoryCache()
+    with MockMermaidAPI(projects=1) as api:
+        client = Client(url=api.url, memory_cache=memory_cache)
+        species = client.get_fish_species()
+
+        assert client.get_fish_species() is species
+        assert api.request_count == 1
+        assert client.metrics.counters["cache_hits_memory"]["fishspecies"] == 1
+
+        # Responses aren't shared across auth identities, and other resources aren't cached.
+        Client(url=api.url, token="other", memory_cache=memory_cache).get_fish_species()
+        client.get_sample_events(id=api.projects[0]["id"])
+        client.get_sample_events(id=api.projects[0]["id"])
+        assert api.request_count == 4
+
+        # Expired responses are fetched again.
+        expiring = Client(url=api.url, memory_cache=MemoryCache(ttls={"fishspecies": 0}))
+        expiring.get_fish_species()
+        expiring.get_fish_species()
+        assert api.request_count == 6
@@ -0,0 +1,57 @@
+import pytest
+from ..catalog import *
+
+
+@pytest.fixture
+def catalog():
+    return TaxonomyCatalog(
+        families=[{"id": "f1", "name": "Acanthuridae"}],
+        genera=[{"id": "g1", "name": "Acanthurus", "family": "f1"}],
+        species=[
+            {
+                "id": "s1",
+                "name": "lineatus",
+                "display_name": "Acanthurus lineatus",
+                "genus": "g1",
+                "biomass_constant_a": 0.0197,
+                "biomass_constant_b": 3.0,
+                "biomass_constant_c": 1.0,
+            }
+        ],
+        groupings=[{"id": "gr1", "name": "Surgeonfish", "fish_attributes": ["g1"]}],
+        benthic_attributes=[
+            {"id": "b1", "name": "Hard coral", "parent": None},
+            {"id": "b2", "name": "Acropora", "parent": "b1"},
+        ],
+    )
+
+
+def test_fish_lookup(catalog):
+    species = catalog.fish["s1"]
+    assert catalog.fish_by_name["Acanthurus lineatus"] is species
+    assert [taxon.id for taxon in catalog.fish_lineage("s1")] == ["s1", "g1", "f1"]
+    assert catalog.fish_rank("s1", "family").name == "Acanthuridae"
+    assert catalog.fish_rank("s1", "grouping") is None
+    assert catalog.fish_lineage("unknown") == []
+
+
+def test_fish_groupings(catalog):
+    # Species are members of groupings listing one of their ancestors.
+    assert [grouping.id for grouping in catalog.fish_groupings("s1")] == ["gr1"]
+    assert catalog.fish_groupings("f1") == []
+
+
+def test_biomass_constants(catalog):
+    assert catalog.biomass_constants("s1") == (0.0197, 3.0, 1.0)
+    assert catalog.biomass_constants("unknown") is None
+
+
+def test_benthic_lookup(catalog):
+    assert catalog.benthic_by_name["Acropora"].id == "b2"
+    assert catalog.benthic_category("b2").name == "Hard coral"
+    assert catalog.benthic_category("unknown") is None
+
+
+def test_slots(catalog):
+    with pytest.raises(AttributeError):
+        catalog.fish["s1"].extra = 1
@@ -1,6 +1,12 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from ..cache import MemoryCache
 from ..client import Client
 from ..exceptions import *
+from .mock_api import MockMermaidAPI
 
 # Valid data
 # Run jupyter notebook sign-in widget to get token, if tests fail with unauthorized 401 Exception, attempt token refresh
@@ -160,6 +166,8 @@ def test_get_project_resource(resource):
         "obsbenthiclits",
         "obsbenthicpits",
         "obshabitatcomplexities",
+        "obscoloniesbleached",
+        "obsquadratbenthicpercent",
     ],
 )
 @pytest.mark.client_project
@@ -177,7 +185,7 @@ def test_get_observations(observation):
         ],
         "obsbenthiclits": [
             "benthiclit",
-            "benthicpit__transect",
+            "benthiclit__transect",
             "benthiclit__transect__sample_event",
             "attribute",
             "growth_form",
@@ -197,6 +205,19 @@ def test_get_observations(observation):
             "habitatcomplexity__transect__sample_event",
             "score",
         ],
+        "obscoloniesbleached": [
+            "bleachingquadratcollection",
+            "bleachingquadratcollection__quadrat",
+            "bleachingquadratcollection__quadrat__sample_event",
+            "attribute",
+            "growth_form",
+        ],
+        "obsquadratbenthicpercent": [
+            "bleachingquadratcollection",
+            "bleachingquadratcollection__quadrat",
+            "bleachingquadratcollection__quadrat__sample_event",
+            "quadrat_number",
+        ],
     }
     f_vals = [
         "size_min",
@@ -227,9 +248,12 @@ def test_get_observations(observation):
                 observation="obstransectbeltfishs", filter=observation, id=valid_id
             )
 
-    # Test each observation with available filter options
+    # Test each observation unfiltered and with available filter options
     else:
         path = f"projects/{valid_id}/{observation}/"
+        assert client.get_observations(
+            observation=observation, id=valid_id
+        ) == client._fetch_resource(resource=path)
         for fil in obs_filters[observation]:
             # API call for filters requiring values, value input = 10
             if fil in f_vals:
@@ -363,3 +387,160 @@ def test_get_sample_events(event):
                 filter=fil, filter_val="2018-11-16", id=valid_id
             )
             assert client_call == api_response
+
+
+@pytest.mark.parametrize("resource", ["fishfamilies", "projects"])
+@pytest.mark.client_info
+def test_iter_resource(resource):
+    first_page = client._fetch_resource(resource=resource)
+    records = list(client.iter_resource(resource))
+
+    # Every page is followed, starting with the records of the first page.
+    assert records[: len(first_page["results"])] == first_page["results"]
+    assert len(records) == first_page["count"]
+    assert client.fetch_all(resource) == records
+
+
+@pytest.mark.client_project
+def test_get_sample_events_bulk():
+    project_ids = [valid_id, valid_id]
+    events = list(client.get_sample_events_bulk(project_ids=project_ids))
+    project_events = client.fetch_all(f"projects/{valid_id}/sampleevents/")
+
+    # Records of each project come out in project_ids order, tagged with the project id.
+    assert len(events) == 2 * len(project_events)
+    assert all(event["project_id"] == valid_id for event in events)
+
+
+@pytest.mark.client_project
+def test_project_index():
+    client.invalidate_project_index()
+    by_name = client.lookup_project(name=valid_name)
+    by_id = client.lookup_project(id=valid_id)
+    assert by_name is by_id
+
+    # Index is reused until invalidated.
+    index = client._get_project_index()
+    assert client._get_project_index() is index
+    client.invalidate_project_index()
+    assert client._get_project_index() is not index
+
+    with pytest.raises(InvalidProjectException):
+        client.lookup_project(name=fail_name)
+
+
+def test_project_index_reused():
+    with MockMermaidAPI(projects=5, page_size=2) as api:
+        mock_client = Client(url=api.url)
+        assert mock_client.get_project_id(name="Project 3") == api.projects[3]["id"]
+
+        api.reset()
+        assert mock_client.lookup_project(id=api.projects[1]["id"])["name"] == "Project 1"
+        assert mock_client.get_project(name="Project 3")["id"] == api.projects[3]["id"]
+        assert api.request_count == 0
+
+        # Expired indexes are rebuilt, 3 pages of 2 projects.
+        mock_client.project_index_ttl = 0
+        mock_client.get_project_id(name="Project 3")
+        assert api.request_count == 3
+
+
+def test_retries():
+    with MockMermaidAPI(projects=1) as api:
+        mock_client = Client(url=api.url, backoff_factor=0.01)
+
+        # Transient failures are retried until they succeed.
+        api.fail("fishspecies", 503, 502)
+        assert mock_client.get_fish_species()["count"] == 200
+        assert api.request_count == 3
+        assert mock_client.metrics.counters["retries"]["fishspecies"] == 2
+
+        # Other errors aren't retried.
+        api.reset()
+        api.fail("fishspecies", 400)
+        with pytest.raises(FatalResponseException):
+            mock_client.get_fish_species()
+        assert api.request_count == 1
+
+
+def test_retry_after():
+    with MockMermaidAPI(projects=1) as api:
+        mock_client = Client(url=api.url, backoff_factor=0, retries=1)
+
+        # Retry-After is honored over backoff.
+        api.fail("fishspecies", 429, retry_after="0.3")
+        start = time.perf_counter()
+        mock_client.get_fish_species()
+        assert time.perf_counter() - start >= 0.3
+
+        # Exhausted retries raise with the server's Retry-After.
+        api.fail("fishspecies", 429, 429, retry_after="0")
+        with pytest.raises(RateLimitedException) as e:
+            mock_client.get_fish_species()
+        assert e.value.retry_after == 0
+
+        # Retry-After longer than backoff_max raises at once instead of blocking.
+        api.fail("fishspecies", 429, retry_after="3600")
+        api.reset()
+        start = time.perf_counter()
+        with pytest.raises(RateLimitedException) as e:
+            mock_client.get_fish_species()
+        assert e.value.retry_after == 3600
+        assert api.request_count == 1
+        assert time.perf_counter() - start < 1
+
+        api.fail("fishspecies", 503, 503)
+        with pytest.raises(RetryableResponseException) as e:
+            mock_client.get_fish_species()
+        assert not isinstance(e.value, RateLimitedException)
+
+
+def test_single_flight():
+    with MockMermaidAPI(projects=2, latency=0.2) as api:
+        mock_client = Client(url=api.url)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(lambda _: mock_client.get_fish_species(), range(8)))
+
+        # One request, every thread gets its result.
+        assert api.request_count == 1
+        assert all(response is responses[0] for response in responses)
+        assert mock_client.metrics.counters["coalesced"]["fishspecies"] == 7
+
+
+def test_bulk_concurrency():
+    with MockMermaidAPI(projects=4, sample_events=5, observations=0, latency=0.1) as api:
+        mock_client = Client(url=api.url)
+        lock = threading.Lock()
+        active, overlap = [0], [0]
+
+        def started(prepped, resource):
+            with lock:
+                active[0] += 1
+                overlap[0] = max(overlap[0], active[0])
+
+        def finished(resp, resource, seconds):
+            with lock:
+                active[0] -= 1
+
+        mock_client.add_hook("pre_request", started)
+        mock_client.add_hook("post_response", finished)
+        project_ids = [project["id"] for project in api.projects]
+        events = list(mock_client.get_sample_events_bulk(project_ids))
+
+        # A default Client fetches every project at once.
+        assert overlap[0] == 4
+        assert [event["project_id"] for event in events] == [p_id for p_id in project_ids for _ in range(5)]
+
+
+def test_bulk_copies_records():
+    with MockMermaidAPI(projects=2, sample_events=3, observations=0) as api:
+        project_ids = [project["id"] for project in api.projects]
+        memory_cache = MemoryCache(ttls={f"projects/{p_id}/sampleevents": None for p_id in project_ids})
+        mock_client = Client(url=api.url, memory_cache=memory_cache)
+
+        assert all(event["project_id"] for event in mock_client.get_sample_events_bulk(project_ids))
+        # Cached pages shared with other callers aren't tagged.
+        api.reset()
+        for p_id in project_ids:
+            assert "project_id" not in mock_client.get_sample_events(id=p_id)["results"][0]
+        assert api.request_count == 0
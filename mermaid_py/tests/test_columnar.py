@@ -0,0 +1,40 @@
+import pytest
+from ..columnar import *
+
+pyarrow = pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_write_read_dataset(tmp_path, format):
+    # Second batch has a value in a column that is null throughout the first batch.
+    records = [{"id": str(n), "size": n, "notes": None} for n in range(3)]
+    records.append({"id": "3", "size": 3, "notes": "checked"})
+
+    paths = write_dataset(
+        iter(records), str(tmp_path), "p1", "obstransectbeltfishs", format=format, batch_size=3
+    )
+    assert len(paths) == 2
+
+    dataset = read_dataset(str(tmp_path), resource="obstransectbeltfishs", format=format)
+    table = dataset.to_table(columns=["size", "notes", "project"])
+    assert table.column("size").to_pylist() == [0, 1, 2, 3]
+    assert table.column("notes").to_pylist() == [None, None, None, "checked"]
+    assert set(table.column("project").to_pylist()) == {"p1"}
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_read_mixed_numeric_batches(tmp_path, format):
+    # Sizes are integral throughout the first batch and fractional in the second.
+    records = [{"id": "1", "size": 10}, {"id": "2", "size": 12}, {"id": "3", "size": 12.5}]
+    write_dataset(
+        iter(records), str(tmp_path), "p1", "obstransectbeltfishs", format=format, batch_size=2
+    )
+
+    table = read_dataset(str(tmp_path), format=format).to_table(columns=["size"])
+    assert table.schema.field("size").type == pyarrow.float64()
+    assert table.column("size").to_pylist() == [10.0, 12.0, 12.5]
+
+
+def test_invalid_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_dataset([], str(tmp_path), "p1", "sites", format="csv")
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from ..decoding import *
+
+page = {
+    "count": 3,
+    "next": "https://dev-api.datamermaid.org/v1/fishspecies/?page=2",
+    "previous": None,
+    "results": [{"id": str(n), "name": f"species {n}", "regions": ["é"]} for n in range(3)],
+}
+
+
+def chunked(data: bytes, size: int):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_streamed_page(size):
+    streamed = StreamedPage(chunked(json.dumps(page, ensure_ascii=False).encode("utf-8"), size))
+
+    assert streamed.meta == {"count": 3, "next": page["next"], "previous": None}
+    assert list(streamed.results()) == page["results"]
+
+
+def test_streamed_page_unpaginated():
+    body = {"status": "ok", "data": [1, 2]}
+    streamed = StreamedPage(chunked(json.dumps(body).encode("utf-8"), 5))
+
+    assert streamed.meta is None
+    assert streamed.page() == body
+
+
+def test_streamed_page_truncated():
+    data = json.dumps(page).encode("utf-8")[:-20]
+    with pytest.raises(ValueError):
+        list(StreamedPage(chunked(data, 16)).results())
+
+
+def test_loads():
+    assert loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+from ..client import Client
+from ..columnar import read_checkpoint, read_dataset, partition_path
+
+pyarrow = pytest.importorskip("pyarrow")
+
+MOCK_API = {"projects": 1, "sample_events": 5, "observations": 1000, "page_size": 100}
+
+
+def test_export_resume(api, tmp_path):
+    client = Client(url=api.url, retries=0)
+    project_id = api.projects[0]["id"]
+    directory = partition_path(str(tmp_path), project_id, "obstransectbeltfishs")
+
+    def fail_page_7(prepped, resource):
+        if "page=7" in prepped.url:
+            raise RuntimeError("Connection lost")
+
+    client.add_hook("pre_request", fail_page_7)
+    with pytest.raises(RuntimeError):
+        client.export_resource("obstransectbeltfishs", str(tmp_path), id=project_id, batch_size=200)
+    checkpoint = read_checkpoint(directory)
+    assert checkpoint["records"] == 600
+    assert checkpoint["parts"] == ["part-00000.parquet", "part-00001.parquet", "part-00002.parquet"]
+    assert not checkpoint["complete"]
+
+    client.remove_hook("pre_request", fail_page_7)
+    api.reset()
+    paths = client.export_resource(
+        "obstransectbeltfishs", str(tmp_path), id=project_id, batch_size=200, resume=True
+    )
+    # Pages 7 to 10 only.
+    assert api.request_count == 4
+    assert len(paths) == 5
+    assert read_checkpoint(directory)["complete"]
+
+    ids = read_dataset(str(tmp_path)).to_table(columns=["id"]).column("id").to_pylist()
+    assert ids == [obs["id"] for obs in api.project_resources[project_id]["obstransectbeltfishs"]]
+
+    # Completed exports aren't fetched again.
+    api.reset()
+    assert (
+        client.export_resource(
+            "obstransectbeltfishs", str(tmp_path), id=project_id, batch_size=200, resume=True
+        )
+        == paths
+    )
+    assert api.request_count == 0
+
+
+@pytest.mark.parametrize("first_workers", [1, 4])
+def test_export_resume_concurrent(api, tmp_path, first_workers):
+    client = Client(url=api.url, retries=0, max_workers=first_workers)
+    project_id = api.projects[0]["id"]
+
+    def fail_page_7(prepped, resource):
+        if "page=7" in prepped.url:
+            raise RuntimeError("Connection lost")
+
+    client.add_hook("pre_request", fail_page_7)
+    with pytest.raises(RuntimeError):
+        client.export_resource("obstransectbeltfishs", str(tmp_path), id=project_id, batch_size=200)
+    client.remove_hook("pre_request", fail_page_7)
+
+    # Prefetched pages resume from the checkpoint page, not from page 2.
+    api.reset()
+    client = Client(url=api.url, max_workers=4)
+    client.export_resource(
+        "obstransectbeltfishs", str(tmp_path), id=project_id, batch_size=200, resume=True
+    )
+    # Pages 7 to 10 only.
+    assert api.request_count == 4
+
+    records = api.project_resources[project_id]["obstransectbeltfishs"]
+
+    ids = read_dataset(str(tmp_path)).to_table(columns=["id"]).column("id").to_pylist()
+    assert len(ids) == len(set(ids)) == len(records)
+    assert ids == [obs["id"] for obs in records]
+
+
+def test_export_resume_other_filter(api, tmp_path):
+    client = Client(url=api.url)
+    project_id = api.projects[0]["id"]
+
+    client.export_resource("obstransectbeltfishs", str(tmp_path), id=project_id)
+    # A checkpoint of another filter isn't resumed.
+    paths = client.export_resource(
+        "obstransectbeltfishs",
+        str(tmp_path),
+        id=project_id,
+        filter="size_min",
+        filter_val=30,
+        resume=True,
+    )
+    assert [os.path.basename(path) for path in paths] == ["part-00000.parquet"]
@@ -0,0 +1,117 @@
+from datetime import date
+
+import pytest
+from ..client import Client
+from ..exceptions import InvalidResourceException
+from ..filters import *
+
+MOCK_API = {"projects": 1, "sample_events": 28, "observations": 300}
+
+
+@pytest.fixture
+def client(api):
+    return Client(url=api.url)
+
+
+def test_observation_filters(api, client):
+    project_id = api.projects[0]["id"]
+
+    api.reset()
+    observations = list(
+        client.iter_observations(
+            "obstransectbeltfishs", id=project_id, filters={"size_min": 10, "size_max": 12}
+        )
+    )
+    assert observations
+    assert {obs["size"] for obs in observations} == {10, 11, 12}
+    # Filtered by the server in one request.
+    assert api.request_count == 1
+
+
+def test_sample_event_date_range(api, client):
+    events = client.get_sample_events(
+        id=api.projects[0]["id"],
+        filters={"sample_date_after": "2020-01-10", "sample_date_before": date(2020, 1, 12)},
+    )
+    assert [event["sample_date"] for event in events["results"]] == [
+        "2020-01-10",
+        "2020-01-11",
+        "2020-01-12",
+    ]
+
+
+def test_invalid_filters(client):
+    with pytest.raises(InvalidResourceException):
+        client.get_observations("obstransectbeltfishs", id="1", filters={"len_surveyed_min": 1})
+    with pytest.raises(InvalidResourceException):
+        client.get_sample_events(id="1", filter="sample_date_after", filters={"size_min": 1})
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_fields(api, stream):
+    client = Client(url=api.url, stream=stream)
+    project_id = api.projects[0]["id"]
+
+    observations = list(
+        client.iter_observations("obstransectbeltfishs", id=project_id, fields=["size", "count"])
+    )
+    assert len(observations) == 300
+    assert set(observations[0]) == {"size", "count"}
+
+    page = client.get_sample_events(id=project_id, fields=["id"])
+    assert page["count"] == 28
+    assert [set(event) for event in page["results"]] == [{"id"}] * 28
+
+
+def test_fields_parameter(api, client):
+    urls = []
+    client.add_hook("pre_request", lambda prepped, resource: urls.append(prepped.url))
+    client.fields_parameter = "fields"
+
+    client.get_sample_events(id=api.projects[0]["id"], fields=["id", "sample_date"])
+    assert "fields=id%2Csample_date" in urls[0]
+
+
+def test_registry():
+    assert "obsquadratbenthicpercent" in REGISTRY
+    assert "benthiclit__transect" in REGISTRY.filters("obsbenthiclits")
+    assert REGISTRY.filters("unknown") == frozenset()
+
+    REGISTRY.validate("obscoloniesbleached")
+    REGISTRY.validate("sampleevents", ["sample_date_after", "sample_date_before"])
+    with pytest.raises(InvalidResourceException):
+        REGISTRY.validate("obsbenthiclits", ["benthicpit__transect"])
+    with pytest.raises(InvalidResourceException):
+        REGISTRY.validate("unknown")
+
+
+def test_registry_from_openapi():
+    schema = {
+        "paths": {
+            "/v1/projects/{project_pk}/obstransectbeltfishs/": {
+                "get": {
+                    "parameters": [
+                        {"name": "page", "in": "query"},
+                        {"name": "project_pk", "in": "path"},
+                        {"name": "size_min", "in": "query"},
+                        {"name": "sample_date", "in": "query"},
+                    ]
+                }
+            },
+            "/v1/projects/{project_pk}/obstransectbeltfishs/{id}/": {"get": {"parameters": []}},
+        }
+    }
+    registry = FilterRegistry.from_openapi(schema)
+
+    assert "sample_date" in registry.filters("obstransectbeltfishs")
+    assert "page" not in registry.filters("obstransectbeltfishs")
+    assert "beltfish" in registry.filters("obstransectbeltfishs")
+    assert registry.filters("sampleevents") == REGISTRY.filters("sampleevents")
+
+
+def test_unfiltered_observations(api, client):
+    # Every observation resource can be fetched without a filter.
+    page = client.get_observations("obstransectbeltfishs", id=api.projects[0]["id"])
+    assert page["count"] == 300
+    with pytest.raises(InvalidResourceException):
+        client.get_observations("obscoloniesbleached", id="1", filter="size_min")
@@ -0,0 +1,110 @@
+import datetime
+
+import pytest
+from ..client import Client
+from ..frames import *
+from .mock_api import MockMermaidAPI
+
+records = [
+    {
+        "id": "1",
+        "fish_attribute": "s1",
+        "size": 12.5,
+        "count": 3,
+        "created_on": "2023-01-01T00:00:00Z",
+        "beltfish": {"id": "b1", "transect": "t1"},
+    },
+    {"id": "2", "fish_attribute": "s2", "size": 7.5, "count": 1, "notes": "late"},
+]
+
+
+def test_flatten():
+    assert flatten({"a": 1, "b": {"c": 2, "d": {"e": [3]}}}) == {
+        "a": 1,
+        "b__c": 2,
+        "b__d__e": [3],
+    }
+
+
+def test_column_builder():
+    pa = pytest.importorskip("pyarrow")
+    builder = ColumnBuilder("projects/p1/obstransectbeltfishs/")
+    builder.page_size = 1
+    builder.extend(records)
+
+    assert builder.length == 2
+    assert len(builder.batches) == 2
+    assert builder.batches[1].schema.field("size").type == pa.float64()
+    assert builder.schema["fish_attribute"] == "category"
+
+    table = builder.to_arrow()
+    assert table.column("beltfish__transect").to_pylist() == ["t1", None]
+    # Columns first seen in a later page are null in earlier pages.
+    assert table.column("notes").to_pylist() == [None, "late"]
+
+
+def test_column_builder_fallback():
+    pa = pytest.importorskip("pyarrow")
+    builder = ColumnBuilder("obstransectbeltfishs")
+    builder.page_size = 2
+    builder.extend(
+        [
+            {"id": "1", "depth": 1, "code": 7, "tags": None},
+            {"id": "2", "depth": 2, "code": "a", "tags": None},
+            {"id": "3", "depth": 2.5, "code": 8, "tags": ["x"]},
+        ]
+    )
+    table = builder.to_arrow()
+
+    # Numbers are promoted across pages, columns without one type are strings.
+    assert table.schema.field("depth").type == pa.float64()
+    assert table.column("depth").to_pylist() == [1.0, 2.0, 2.5]
+    assert table.column("code").to_pylist() == ["7", "a", "8"]
+    assert table.column("tags").to_pylist() == [None, None, ["x"]]
+
+
+def test_to_frame():
+    pd = pytest.importorskip("pandas")
+    frame = to_output(iter(records), "obstransectbeltfishs", "frame")
+
+    assert isinstance(frame.dtypes["fish_attribute"], pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(frame.dtypes["created_on"])
+    assert frame["size"].tolist() == [12.5, 7.5]
+
+
+def test_to_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = to_output(iter(records), "obstransectbeltfishs", "arrow")
+
+    assert pa.types.is_dictionary(table.schema.field("fish_attribute").type)
+    assert table.column("count").to_pylist() == [3.0, 1.0]
+
+
+def test_sample_dates():
+    pytest.importorskip("pyarrow")
+    pd = pytest.importorskip("pandas")
+    events = [{"id": "1", "sample_date": "2020-01-10"}, {"id": "2", "sample_date": None}]
+
+    table = to_output(iter(events), "sampleevents", "arrow")
+    assert table.column("sample_date").to_pylist() == [datetime.date(2020, 1, 10), None]
+
+    frame = to_output(iter(events), "sampleevents", "frame")
+    assert frame["sample_date"][0] == pd.Timestamp("2020-01-10")
+    assert pd.isna(frame["sample_date"][1])
+
+
+def test_sample_events_arrow():
+    pa = pytest.importorskip("pyarrow")
+    with MockMermaidAPI(projects=1, sample_events=3, observations=0) as api:
+        client = Client(url=api.url)
+        table = client.get_sample_events(id=api.projects[0]["id"], output="arrow")
+
+    assert table.schema.field("sample_date").type == pa.date32()
+    assert table.column("sample_date").to_pylist() == [
+        datetime.date(2020, 1, n) for n in (1, 2, 3)
+    ]
+
+
+def test_invalid_output():
+    with pytest.raises(ValueError):
+        to_output([], "sampleevents", "csv")
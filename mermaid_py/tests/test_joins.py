@@ -0,0 +1,86 @@
+import pytest
+from ..exceptions import InvalidResourceException
+from ..client import Client
+from ..joins import *
+from .mock_api import MockMermaidAPI
+
+
+@pytest.fixture
+def join():
+    return ProjectJoin(
+        "obsbenthicpits",
+        methods=[{"id": "m1", "transect": "t1"}],
+        sample_units=[{"id": "t1", "sample_event": "e1", "len_surveyed": 50}],
+        sample_events=[{"id": "e1", "site": "s1", "management": "mr1", "sample_date": "2020-01-01"}],
+        sites=[{"id": "s1", "name": "Reef"}],
+        managements=[{"id": "mr1", "name": "Open access"}],
+    )
+
+
+def test_related(join):
+    related = join.related({"benthicpit": "m1"})
+    assert related["sample_unit"]["len_surveyed"] == 50
+    assert related["site"]["name"] == "Reef"
+    assert join.related({"benthicpit": "unknown"}) == dict.fromkeys(RELATIONS)
+
+
+def test_denormalize(join):
+    records = join.denormalize(iter([{"id": "o1", "benthicpit": "m1", "attribute": "b1"}]))
+    record = next(records)
+    assert record["attribute"] == "b1"
+    assert record["sample_unit__len_surveyed"] == 50
+    assert record["sample_event__sample_date"] == "2020-01-01"
+    assert record["management__name"] == "Open access"
+
+    (record,) = join.denormalize([{"id": "o2", "benthicpit": "m1"}], relations=("site",))
+    assert record == {"id": "o2", "benthicpit": "m1", "site__id": "s1", "site__name": "Reef"}
+
+
+@pytest.mark.parametrize(
+    "observation, method_key, unit_key",
+    [
+        ("obshabitatcomplexities", "habitatcomplexity", "transect"),
+        ("obscoloniesbleached", "bleachingquadratcollection", "quadrat"),
+    ],
+)
+def test_observation_relations(observation, method_key, unit_key):
+    join = ProjectJoin(
+        observation,
+        methods=[{"id": "m1", unit_key: "u1"}],
+        sample_units=[{"id": "u1", "sample_event": "e1"}],
+        sample_events=[{"id": "e1", "site": "s1", "management": "mr1"}],
+        sites=[{"id": "s1", "name": "Reef"}],
+        managements=[{"id": "mr1", "name": "Open access"}],
+    )
+    (record,) = join.denormalize([{"id": "o1", method_key: "m1"}])
+    assert record["sample_unit__id"] == "u1"
+    assert record["site__name"] == "Reef"
+    assert record["management__name"] == "Open access"
+
+
+def test_observation_relations_resources():
+    # Every observation resource can be joined.
+    assert set(OBSERVATION_RELATIONS) == set(Client.project_observations)
+
+
+def test_invalid_observation():
+    with pytest.raises(ValueError):
+        ProjectJoin("obsunknown")
+
+
+def test_iter_joined_observations():
+    with MockMermaidAPI(projects=1, sample_events=4, observations=250) as api:
+        client = Client(url=api.url)
+        project_id = api.projects[0]["id"]
+
+        api.reset()
+        records = list(client.iter_joined_observations("obstransectbeltfishs", id=project_id))
+        assert len(records) == 250
+        assert records[0]["sample_event__sample_date"] == "2020-01-01"
+        assert records[0]["site__name"] == "Site 0"
+        # One request per related resource and observation page, none per observation.
+        assert api.request_count == 5 + 3
+
+        # Observation filters are validated like iter_observations.
+        with pytest.raises(InvalidResourceException):
+            client.iter_joined_observations("obstransectbeltfishs", id=project_id, filters={"score": 1})
@@ -0,0 +1,52 @@
+from ..metrics import *
+
+project_id = "7c3bbbe6-5b9c-4c29-8e15-0b1b3fca8a5e"
+
+
+def test_endpoint_name():
+    assert endpoint_name(f"projects/{project_id}/obstransectbeltfishs/") == (
+        "projects/{id}/obstransectbeltfishs"
+    )
+    assert endpoint_name("fishspecies") == "fishspecies"
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1, float("inf")))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.to_dict() == {
+        "count": 3,
+        "sum": 5.55,
+        "buckets": {"0.1": 1, "1": 2, "inf": 3},
+    }
+
+
+def test_metrics():
+    metrics = Metrics()
+    metrics.observe_request(f"projects/{project_id}/sampleevents", 0.2, size=1000)
+    metrics.observe_request("projects/other/sampleevents", 0.3)
+    metrics.observe_decode("fishspecies", 0.01)
+    metrics.increment("pages", "fishspecies", 2)
+
+    exported = metrics.to_dict()
+    assert exported["counters"]["requests"] == {
+        "projects/{id}/sampleevents": 1,
+        "projects/other/sampleevents": 1,
+    }
+    assert exported["counters"]["bytes"] == {"projects/{id}/sampleevents": 1000}
+    assert exported["counters"]["pages"] == {"fishspecies": 2}
+    assert exported["seconds"]["decode"] == {"fishspecies": 0.01}
+    assert exported["latency"]["projects/{id}/sampleevents"]["count"] == 1
+
+    text = metrics.to_prometheus()
+    assert 'mermaid_client_pages_total{endpoint="fishspecies"} 2' in text
+    assert 'mermaid_client_request_seconds_bucket{endpoint="projects/{id}/sampleevents",le="+Inf"} 1' in text
+
+    metrics.reset()
+    assert metrics.to_dict() == {"latency": {}, "counters": {}, "seconds": {}}
+
+
+def test_span():
+    # No-op without opentelemetry-api.
+    with Metrics().span("fishspecies"):
+        pass
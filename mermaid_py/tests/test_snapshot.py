@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+
+import pytest
+from ..client import Client
+
+RESOURCES = [
+    "sites",
+    "managements",
+    "sites",
+    "collectrecords",
+    "fishbelttransects",
+    "beltfishtransectmethods",
+    "obstransectbeltfishs",
+    "sampleevents",
+]
+MOCK_API = {"projects": 2, "sample_events": 5, "observations": 250, "page_size": 100}
+
+
+def test_snapshot_project(api):
+    client = Client(url=api.url)
+    project = api.projects[0]
+    progress = []
+
+    api.reset()
+    snapshot = client.snapshot_project(
+        name=project["name"],
+        resources=RESOURCES,
+        progress=lambda *args: progress.append(args),
+    )
+
+    assert snapshot["project"]["id"] == project["id"]
+    assert snapshot["counts"] == {
+        "sites": 1,
+        "managements": 1,
+        "fishbelttransects": 5,
+        "beltfishtransectmethods": 5,
+        "obstransectbeltfishs": 250,
+        "sampleevents": 5,
+    }
+    assert len(snapshot["resources"]["obstransectbeltfishs"]) == 250
+    # Unauthenticated clients can't read collect records.
+    assert snapshot["unavailable"] == ["collectrecords"]
+    assert sorted(n for _, n, _ in progress) == list(range(1, 8))
+    # Project index, project, one request per planned resource and two more pages of obstransectbeltfishs.
+    assert api.requests[f"/v1/projects/{project['id']}/sites"] == 1
+    assert api.request_count == 1 + 1 + 7 + 2
+
+
+def test_snapshot_concurrency(api):
+    # A default Client fetches the planned resources at once.
+    client = Client(url=api.url)
+    lock = threading.Lock()
+    active, overlap = [0], [0]
+
+    def started(prepped, resource):
+        with lock:
+            active[0] += 1
+            overlap[0] = max(overlap[0], active[0])
+
+    def finished(resp, resource, seconds):
+        with lock:
+            active[0] -= 1
+
+    client.add_hook("pre_request", started)
+    client.add_hook("post_response", finished)
+    api.latency = 0.1
+    try:
+        client.snapshot_project(id=api.projects[0]["id"], resources=RESOURCES)
+    finally:
+        api.latency = 0
+    assert overlap[0] > 1
+
+
+def test_snapshot_project_root(api, tmp_path):
+    pytest.importorskip("pyarrow")
+    from ..columnar import read_dataset
+
+    client = Client(url=api.url, max_workers=4)
+    project_id = api.projects[1]["id"]
+
+    snapshot = client.snapshot_project(
+        id=project_id, resources=RESOURCES, root=str(tmp_path), batch_size=100
+    )
+
+    assert "resources" not in snapshot
+    assert len(snapshot["files"]["obstransectbeltfishs"]) == 3
+    with open(os.path.join(tmp_path, f"project={project_id}", "snapshot.json")) as f:
+        assert json.load(f) == snapshot
+    dataset = read_dataset(str(tmp_path), project=project_id, resource="sampleevents")
+    assert dataset.count_rows() == 5
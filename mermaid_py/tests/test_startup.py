@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from ..async_client import AsyncClient
+from ..client import Client
+from .mock_api import MockMermaidAPI
+
+# Seconds allowed to import mermaid_py modules in a fresh interpreter, and to construct a client.
+IMPORT_BUDGET = float(os.environ.get("MERMAID_IMPORT_BUDGET", 0.25))
+CONSTRUCTION_BUDGET = float(os.environ.get("MERMAID_CONSTRUCTION_BUDGET", 0.001))
+# Dependencies and optional backends only imported when used.
+LAZY_MODULES = ["requests", "urllib3", "httpx", "pandas", "pyarrow", "orjson", "sqlite3", "brotli"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def fresh_import(statement: str):
+    # Imports in a fresh interpreter, returning the seconds taken and the lazy modules it loaded.
+    code = f"""
+import json, sys, time
+preloaded = set(sys.modules)
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": [m for m in sys.modules if m not in preloaded]}}))
+"""
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    result = json.loads(out.stdout)
+    loaded = {module.split(".")[0] for module in result["modules"]}
+    return result["seconds"], sorted(loaded.intersection(LAZY_MODULES))
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import mermaid_py",
+        "import mermaid_py.client",
+        "from mermaid_py import Client; Client()",
+        "import mermaid_py.async_client",
+        "from mermaid_py import AsyncClient; AsyncClient()",
+    ],
+)
+def test_import(statement):
+    fresh_import(statement)  # Warms the bytecode cache.
+    seconds, loaded = min(fresh_import(statement) for _ in range(3))
+
+    assert loaded == []
+    assert seconds < IMPORT_BUDGET
+
+
+@pytest.mark.parametrize("client_class", [Client, AsyncClient])
+def test_construction(client_class):
+    client_class()
+    n = 1000
+    start = time.perf_counter()
+    for _ in range(n):
+        client_class(token="token")
+    assert (time.perf_counter() - start) / n < CONSTRUCTION_BUDGET
+
+
+def test_lazy_session():
+    with MockMermaidAPI(projects=1, sample_events=1, observations=1) as api:
+        client = Client(url=api.url, token="token", max_workers=4)
+        assert client._session is None
+
+        # Threads racing for the first request share one session.
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(client.session)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(session) for session in sessions}) == 1
+
+        assert client.session.headers["authorization"] == "Bearer token"
+        assert client.session.get_adapter(api.url)._pool_maxsize == 10
+        assert client.get_projects()["count"] == 1
+        assert api.request_count == 1
+
+
+def test_lazy_async_session():
+    async def fetch(url):
+        async with AsyncClient(url=url, token="token") as client:
+            assert client._session is None
+            projects = await client.get_projects()
+            assert client.session.headers["authorization"] == "Bearer token"
+            return projects
+
+    with MockMermaidAPI(projects=1, sample_events=1, observations=1) as api:
+        assert asyncio.run(fetch(api.url))["count"] == 1
+        assert api.request_count == 1
+
+    # Closing an unused client doesn't create a session.
+    client = AsyncClient()
+    asyncio.run(client.aclose())
+    assert client._session is None
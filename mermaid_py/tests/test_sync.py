@@ -0,0 +1,91 @@
+import pytest
+from ..client import Client
+from ..sync import *
+from .mock_api import MockMermaidAPI
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SyncStore(path=str(tmp_path / "mermaid.sqlite"))
+
+
+def test_replace(store):
+    assert store.watermark("p1", "sampleevents") is None
+
+    records = ({"id": str(n), "sample_date": "2018-11-16"} for n in range(3))
+    assert store.replace("p1", "sampleevents", records, "2023-01-01T00:00:00+00:00") == 3
+    assert store.watermark("p1", "sampleevents") == "2023-01-01T00:00:00+00:00"
+    assert [record["id"] for record in store.records("p1", "sampleevents")] == ["0", "1", "2"]
+    # Projects and resources are kept apart.
+    assert list(store.records("p2", "sampleevents")) == []
+
+
+def test_apply(store):
+    store.replace("p1", "sites", [{"id": "1", "name": "a"}, {"id": "2", "name": "b"}], "t1")
+    store.apply(
+        "p1",
+        "sites",
+        added=[{"id": "3", "name": "c"}],
+        modified=[{"id": "1", "name": "A"}],
+        removed=["2"],
+        timestamp="t2",
+    )
+
+    assert list(store.records("p1", "sites")) == [
+        {"id": "1", "name": "A"},
+        {"id": "3", "name": "c"},
+    ]
+    assert store.watermark("p1", "sites") == "t2"
+
+
+def test_sync_project_resource(store):
+    with MockMermaidAPI(projects=1, sample_events=5, observations=0, page_size=2) as api:
+        client = Client(url=api.url)
+        project_id = api.projects[0]["id"]
+        events = api.project_resources[project_id]["sampleevents"]
+
+        # First sync downloads every page.
+        assert client.sync_project_resource("sampleevents", store, id=project_id) == {
+            "added": 5,
+            "modified": 0,
+            "removed": 0,
+        }
+        assert api.request_count == 3
+
+        api.add_record(project_id, "sampleevents", {"id": "new", "sample_date": "2021-01-01"})
+        api.update_record(project_id, "sampleevents", events[0]["id"], sample_date="2021-02-02")
+        api.remove_record(project_id, "sampleevents", events[1]["id"])
+
+        api.reset()
+        assert client.sync_project_resource("sampleevents", store, id=project_id) == {
+            "added": 1,
+            "modified": 1,
+            "removed": 1,
+        }
+        assert api.request_count == 1
+
+        stored = {record["id"]: record for record in store.records(project_id, "sampleevents")}
+        assert stored == {record["id"]: record for record in events}
+        assert stored[events[0]["id"]]["sample_date"] == "2021-02-02"
+
+
+def test_sync_clock_ahead(store):
+    with MockMermaidAPI(projects=1, sample_events=2, observations=0) as api:
+        client = Client(url=api.url)
+        project_id = api.projects[0]["id"]
+        # The local clock runs 2 minutes ahead of the server.
+        api.clock_offset = -120
+
+        client.sync_project_resource("sampleevents", store, id=project_id)
+        api.add_record(project_id, "sampleevents", {"id": "new"})
+
+        assert client.sync_project_resource("sampleevents", store, id=project_id)["added"] == 1
+        # Changes fetched again within the overlap are merged by id.
+        client.sync_project_resource("sampleevents", store, id=project_id)
+        assert len(list(store.records(project_id, "sampleevents"))) == 3
+
+        # Without an overlap the new record would have been missed.
+        api.add_record(project_id, "sampleevents", {"id": "late"})
+        client.sync_project_resource("sampleevents", store, id=project_id, overlap=0)
+        api.add_record(project_id, "sampleevents", {"id": "missed"})
+        assert client.sync_project_resource("sampleevents", store, id=project_id)["added"] == 0
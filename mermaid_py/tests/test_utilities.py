@@ -0,0 +1,175 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+from ..utilities import *
+
+
+@pytest.mark.parametrize(
+    "filter, filter_val, filters, expected",
+    [
+        (None, None, None, None),
+        ("beltfish", None, None, "beltfish"),
+        ("size_min", 10, None, {"size_min": 10}),
+        ("size_min", 10, {"size_max": 30}, {"size_min": 10, "size_max": 30}),
+        ("beltfish", None, {"size_max": 30}, {"beltfish": "", "size_max": 30}),
+        (
+            None,
+            None,
+            {"sample_date_after": date(2019, 1, 1), "fish_attribute": ("a", "b"), "beltfish": None},
+            {"sample_date_after": "2019-01-01", "fish_attribute": ["a", "b"], "beltfish": ""},
+        ),
+    ],
+)
+def test_build_payload(filter, filter_val, filters, expected):
+    assert build_payload(filter, filter_val, filters) == expected
+
+
+def test_select_page_fields():
+    record = {"id": "1", "size": 10, "count": 2}
+    assert select_fields(record, ["size", "missing"]) == {"size": 10}
+    assert select_page_fields({"count": 1, "results": [record]}, ["id"]) == {"count": 1, "results": [{"id": "1"}]}
+    assert select_page_fields([record], ["count"]) == [{"count": 2}]
+    assert select_page_fields(record, None) is record
+
+
+def test_unique_by_id():
+    records = [{"id": "1", "v": 1}, {"id": "2"}, {"id": "1", "v": 2}, {"id": "3"}]
+    assert unique_by_id(records, exclude=["3"]) == [{"id": "2"}, {"id": "1", "v": 2}]
+
+
+def test_filter_names():
+    assert filter_names() == []
+    assert filter_names("size_min", {"size_min": 1, "size_max": 2}) == ["size_min", "size_max"]
+
+
+@pytest.mark.parametrize(
+    "next_url, count, page_size, expected",
+    [
+        (
+            "https://api/v1/fishspecies/?page=2",
+            250,
+            100,
+            ["https://api/v1/fishspecies/?page=2", "https://api/v1/fishspecies/?page=3"],
+        ),
+        (
+            "https://api/v1/projects/?showall=&limit=100&offset=100",
+            210,
+            100,
+            [
+                "https://api/v1/projects/?showall=&limit=100&offset=100",
+                "https://api/v1/projects/?showall=&limit=100&offset=200",
+            ],
+        ),
+        (
+            "https://api/v1/fishspecies/?page=7",
+            1000,
+            100,
+            [f"https://api/v1/fishspecies/?page={page}" for page in range(7, 11)],
+        ),
+        (
+            "https://api/v1/projects/?limit=100&offset=600",
+            750,
+            100,
+            [
+                "https://api/v1/projects/?limit=100&offset=600",
+                "https://api/v1/projects/?limit=100&offset=700",
+            ],
+        ),
+        ("https://api/v1/fishspecies/?cursor=abc", 250, 100, None),
+        ("https://api/v1/fishspecies/?page=2", None, 100, None),
+    ],
+)
+def test_page_urls(next_url, count, page_size, expected):
+    assert page_urls(next_url, count, page_size) == expected
+
+
+def test_ordered_map():
+    def slow_square(n):
+        # Later items finish first, results must still come out in order.
+        time.sleep((10 - n) * 0.001)
+        return n * n
+
+    assert list(ordered_map(slow_square, range(10), max_workers=4)) == [
+        n * n for n in range(10)
+    ]
+
+
+def test_ordered_map_backpressure():
+    lock = threading.Lock()
+    submitted = []
+
+    def record(n):
+        with lock:
+            submitted.append(n)
+        return n
+
+    results = ordered_map(record, range(100), max_workers=2, max_inflight=3)
+    assert next(results) == 0
+    time.sleep(0.01)
+    # Only the bounded number of items is submitted ahead of the consumer.
+    assert len(submitted) <= 4
+    results.close()
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
+
+
+def test_backoff_delay():
+    delays = [backoff_delay(attempt, 0.5, 4) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert max(backoff_delay(0, 0.5, 4) for _ in range(20)) <= 0.5
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("", None), ("120", 120), ("-1", 0), ("soon", None), ("Wed, 21 Oct 2015 07:28:00 GMT", 0)],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, capacity=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # Burst of 2 then 4 more at 100 per second.
+    assert time.monotonic() - start >= 0.035
+
+
+@pytest.mark.parametrize("rate, capacity", [(0, None), (-1, None), (1, 0.5)])
+def test_token_bucket_invalid(rate, capacity):
+    with pytest.raises(ValueError, match="rate" if rate <= 0 else "capacity"):
+        TokenBucket(rate=rate, capacity=capacity)
+
+
+def test_accept_encoding():
+    assert accept_encoding().startswith("gzip, deflate")
+
+
+def test_single_flight():
+    single_flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow_call():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "result"
+
+    leader = threading.Thread(target=lambda: single_flight.do("key", slow_call))
+    leader.start()
+    started.wait()
+    assert single_flight.do("key", slow_call) == ("result", True)
+    leader.join()
+    assert len(calls) == 1
+
+    # Finished calls aren't shared.
+    assert single_flight.do("key", lambda: "again") == ("again", False)
+    with pytest.raises(ValueError):
+        single_flight.do("key", lambda: int("x"))
@@ -1,3 +1,16 @@
+import itertools
+import math
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Response codes worth retrying: rate limited and transient server errors.
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
 def get_dict_by_keyval(key, val, list):
     """
     Utility function for accessing nested data in JSON object (dict). Iterates list of dictionaries for matching
@@ -12,3 +25,294 @@ def get_dict_by_keyval(key, val, list):
         if key in item and item[key] == val:
             return item
     return None
+
+
+def build_payload(filter=None, filter_val=None, filters: dict = None):
+    """
+    Utility function for building request parameters from MERMAID resource filters.
+    :param filter: filter name eg. 'beltfish', 'size_min'.
+    :param filter_val: (optional) value for filters requiring values.
+    :param filters: (optional) mapping of filter names to values, combined with filter, eg. {'size_min': 10,
+    'size_max': 30}. Dates are sent in ISO format (YYYY-MM-DD), lists as repeated parameters and None as a filter
+    without a value.
+    :return: None, filter (../?filter) or dict (../?filter=filter_val&...).
+    """
+    payload = None
+    if filter:
+        payload = filter
+    if filter and filter_val:
+        payload = {filter: filter_val}
+    if filters:
+        payload = {payload: ""} if isinstance(payload, str) else dict(payload or {})
+        for name, value in filters.items():
+            if value is None:
+                value = ""
+            elif hasattr(value, "isoformat"):
+                value = value.isoformat()
+            elif isinstance(value, (list, tuple, set)):
+                value = list(value)
+            payload[name] = value
+    return payload
+
+
+def filter_names(filter: str = None, filters: dict = None):
+    """
+    Utility function for listing the names of a filter and a mapping of filters.
+    :param filter: (optional) filter name.
+    :param filters: (optional) mapping of filter names to values.
+    :return: list of filter names.
+    """
+    names = [filter] if filter else []
+    return names + [name for name in filters or () if name != filter]
+
+
+def select_fields(record, fields: list):
+    """
+    Utility function for projecting a record onto a subset of its fields.
+    :param record: record eg. an observation.
+    :param fields: field names, missing ones are skipped.
+    :return: dict of fields, or record if it isn't a dict.
+    """
+    if not isinstance(record, dict):
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def select_page_fields(page, fields: list = None):
+    """
+    Utility function for projecting the results of a page onto a subset of their fields.
+    :param page: JSON page, paginated or a list of records.
+    :param fields: (optional) field names. Defaults to (fields=None), page is returned as is.
+    :return: page with projected results.
+    """
+    if not fields:
+        return page
+    if isinstance(page, list):
+        return [select_fields(record, fields) for record in page]
+    if isinstance(page, dict) and isinstance(page.get("results"), list):
+        return dict(page, results=[select_fields(record, fields) for record in page["results"]])
+    return page
+
+
+def unique_by_id(records, exclude=()):
+    """
+    Utility function for dropping records with repeated or excluded ids, keeping the last of each id.
+    :param records: iterable of records.
+    :param exclude: (optional) ids to drop.
+    :return: records in order of their last occurrence.
+    :rtype: list
+    """
+    unique = {}
+    for record in records:
+        unique.pop(record.get("id"), None)
+        unique[record.get("id")] = record
+    excluded = set(exclude)
+    return [record for id, record in unique.items() if id not in excluded]
+
+
+def page_urls(next_url: str, count: int, page_size: int):
+    """
+    Utility function for computing the URLs of all remaining pages of a paginated response from its 'next' link,
+    starting at the page or offset it points to. Supports page number (../?page=2) and limit offset
+    (../?limit=100&offset=100) pagination.
+    :param next_url: 'next' link of the last page fetched, eg. of the first page or of a resumed page.
+    :param count: total number of records.
+    :param page_size: number of records in a full page.
+    :return: list of page URLs in order, or None if they can't be computed.
+    """
+    if not next_url or not count or not page_size:
+        return None
+
+    parts = urlsplit(next_url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    params = dict(query)
+
+    if "offset" in params:
+        page_size = int(params.get("limit") or page_size)
+        key = "offset"
+        values = range(int(params["offset"] or 0), count, page_size)
+    elif "page" in params:
+        key = "page"
+        values = range(int(params["page"] or 1), math.ceil(count / page_size) + 1)
+    else:
+        return None
+
+    return [
+        urlunsplit(
+            parts._replace(
+                query=urlencode([(k, str(v) if k == key else val) for k, val in query])
+            )
+        )
+        for v in values
+    ]
+
+
+def ordered_map(fn, items, max_workers: int, max_inflight: int = None):
+    """
+    Utility function for applying fn to items on a thread pool, yielding results in the order of items. At most
+    max_inflight results are pending at a time, so a slow consumer applies backpressure to the pool.
+    :param fn: function called with each item.
+    :param items: iterable of items.
+    :param max_workers: number of worker threads.
+    :param max_inflight: (optional) maximum number of submitted, unconsumed items. Defaults to 2 * max_workers.
+    :return: generator of fn(item) results.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    max_inflight = max(max_inflight or 2 * max_workers, 1)
+    inflight = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in items:
+                inflight.append(executor.submit(fn, item))
+                if len(inflight) >= max_inflight:
+                    yield inflight.popleft().result()
+            while inflight:
+                yield inflight.popleft().result()
+        finally:
+            # Cancel queued work when the consumer stops early or a fetch fails.
+            for future in inflight:
+                future.cancel()
+
+
+def batched(iterable, n: int):
+    """
+    Utility function for splitting an iterable into lists of n items, the last one possibly shorter.
+    :param iterable: eg. generator of records.
+    :param n: batch size.
+    :return: generator of lists.
+    """
+    iterator = iter(iterable)
+    batch = list(itertools.islice(iterator, n))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(iterator, n))
+
+
+def backoff_delay(attempt: int, factor: float, maximum: float):
+    """
+    Utility function for exponential backoff with full jitter.
+    :param attempt: number of the failed attempt, starting at 0.
+    :param factor: base delay in seconds.
+    :param maximum: maximum delay in seconds.
+    :return: delay in seconds, uniformly drawn from [0, min(maximum, factor * 2 ** attempt)].
+    """
+    return random.uniform(0, min(maximum, factor * 2**attempt))
+
+
+def parse_retry_after(value: str):
+    """
+    Utility function for parsing a Retry-After header, in seconds or as an HTTP date.
+    :param value: header value eg. '120', 'Wed, 21 Oct 2015 07:28:00 GMT'.
+    :return: delay in seconds, None if missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter. Share one instance between clients to limit them together.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        :param rate: tokens (requests) added per second.
+        :param capacity: (optional) maximum burst of tokens, at least 1. Defaults to rate, at least 1.
+        """
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}, must be greater than 0")
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"Invalid capacity: {capacity}, must be at least 1")
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, sleeping until one is available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescing of identical concurrent calls: while a call for a key is running, later calls for the same
+    key wait for it and share its result or exception instead of running again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Runs fn, or waits for the running call with the same key.
+        :param key: hashable call key eg. a request URL.
+        :param fn: function called without arguments.
+        :return: (result, shared), shared is True when the result came from another caller's call.
+        """
+        from concurrent.futures import Future
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def accept_encoding():
+    """
+    Utility function for the Accept-Encoding request header, including brotli when a decoder is installed.
+    :return: header value eg. 'gzip, deflate, br'.
+    """
+    encodings = ["gzip", "deflate"]
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        encodings.append("br")
+        break
+    return ", ".join(encodings)
@@ -13,5 +13,12 @@ setup(
     long_description_content_type="text/markdown",
     package_dir={"": "mermaid_py"},
     packages=find_packages(where="mermaid_py"),
-    install_requires=["requests", "dataclasses-json", "pytest"],
+    install_requires=["requests"],
+    extras_require={
+        "async": ["httpx"],
+        "arrow": ["pyarrow>=14"],
+        "pandas": ["pandas", "pyarrow>=14"],
+        "fast": ["orjson"],
+        "test": ["pytest"],
+    },
 )